@@ -1,8 +1,20 @@
 import pygame
 import os
+import sys
+import json
+import mmap
+import hashlib
+from collections import OrderedDict
+import settings
+import roster
+import map_config
 
 TEXTURE_CACHE = {}
 
+# Pre-rotated sprites keyed by (texture key, angle bin), least recently used first
+ROTATION_CACHE = OrderedDict()
+_rotation_cache_bytes = 0
+
 def load_texture(filename, size=None, fixed_height=None):
     # CHANGED: We now include the size in the key!
     # This prevents the "Small Image" cache from blocking the "Big Image" request.
@@ -29,4 +41,177 @@ def load_texture(filename, size=None, fixed_height=None):
         surf = pygame.Surface(s, pygame.SRCALPHA)
         pygame.draw.circle(surf, (255, 0, 255), (s[0]//2, s[1]//2), s[0]//2)
         TEXTURE_CACHE[key] = surf
-        return surf
\ No newline at end of file
+        return surf
+
+def rotated_texture(filename, angle, size=None, fixed_height=None):
+    """`load_texture(...)` rotated by `angle` degrees (counter-clockwise, like
+    pygame.transform.rotate), snapped to settings.SPRITE_ROTATION_STEP.
+
+    Each (texture, scale, angle bin) is rotated once and kept in an LRU bounded
+    by settings.SPRITE_CACHE_MB, so the render loop never allocates rotations."""
+    global _rotation_cache_bytes
+    step = settings.SPRITE_ROTATION_STEP
+    angle_bin = int(round(angle / step)) % int(round(360 / step))
+    key = (filename, size, fixed_height, angle_bin)
+
+    img = ROTATION_CACHE.get(key)
+    if img is not None:
+        ROTATION_CACHE.move_to_end(key)
+        return img
+
+    img = pygame.transform.rotate(load_texture(filename, size, fixed_height), angle_bin * step)
+    ROTATION_CACHE[key] = img
+    _rotation_cache_bytes += img.get_width() * img.get_height() * img.get_bytesize()
+    limit = settings.SPRITE_CACHE_MB * 1024 * 1024
+    while _rotation_cache_bytes > limit and len(ROTATION_CACHE) > 1:
+        _, old = ROTATION_CACHE.popitem(last=False)
+        _rotation_cache_bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+    return img
+
+
+# --- SPRITE ATLAS ---
+class SpriteAtlas:
+    """Packs named surfaces into one shelf-packed atlas surface.
+
+    `atlas[name]` is a subsurface handle into `atlas.surface`, usable anywhere
+    a surface is (blits, rotations). Pixels are copied exactly, alpha included."""
+    def __init__(self, images, max_width=1024, padding=1):
+        order = sorted(images, key=lambda name: -images[name].get_height())
+        self.rects = {}
+        x = y = shelf_h = width = 0
+        for name in order:
+            w, h = images[name].get_size()
+            if x and x + w > max_width:
+                x, y, shelf_h = 0, y + shelf_h + padding, 0
+            self.rects[name] = pygame.Rect(x, y, w, h)
+            x += w + padding
+            shelf_h = max(shelf_h, h)
+            width = max(width, x)
+        self.surface = pygame.Surface((max(1, width), max(1, y + shelf_h)), pygame.SRCALPHA).convert_alpha()
+        self.surface.fill((0, 0, 0, 0))
+        for name, rect in self.rects.items():
+            # MAX onto transparent black copies RGBA as is (a plain alpha blit would darken soft edges)
+            self.surface.blit(images[name], rect, special_flags=pygame.BLEND_RGBA_MAX)
+        self.sprites = {name: self.surface.subsurface(rect) for name, rect in self.rects.items()}
+
+    def __getitem__(self, name):
+        return self.sprites[name]
+
+def build_match_atlas(image_files, player_size, weapon_height, extra=None):
+    """Atlas of one match's sprites: the lineup's portraits and the weapon (the
+    load_texture entries for them now point into the atlas) plus `extra`
+    {name: surface} pieces such as dust and health-bar fills."""
+    textures = {(f, (player_size, player_size), None) for f in image_files}
+    textures.add(("weapon.png", None, weapon_height))
+    images = {key: load_texture(*key) for key in textures}
+    images.update(extra or {})
+    atlas = SpriteAtlas(images)
+    for key in textures:
+        # Rotations are cut from the atlas copy from now on
+        TEXTURE_CACHE[key] = atlas[key]
+    return atlas
+
+
+# --- ASSET PACK ---
+# Every texture the arena draws at one display scale, decoded and scaled once and
+# stored as raw pixels in the display's native 32-bit layout. Startup maps the
+# file and wraps each buffer with pygame.image.frombuffer: no PNG decode, no
+# smoothscale. Built on first launch at a new resolution, or ahead of time with
+#     python assets_manager.py --height 1080
+PACK_VERSION = 1
+PACK_MAGIC = b"ABLPACK1"
+PACK_DIR = "cache"
+# Open maps backing packed surfaces; they must stay alive as long as the surfaces
+_PACK_MAPS = {}
+
+def match_textures(scale):
+    """(filename, size, fixed_height) of every texture main.py draws at `scale`:
+    all roster portraits (any lineup can be picked), the weapon and the map."""
+    player_size = int(settings.PLAYER_SPRITE_SIZE * scale)
+    keys = {(bot.image_file, (player_size, player_size), None) for bot in roster.ALL_BOTS}
+    keys.add(("weapon.png", None, int(settings.WEAPON_SPRITE_HEIGHT * scale)))
+    keys.add((map_config.MAP_IMAGE_FILE, (int(settings.GAME_WIDTH * scale), int(settings.GAME_HEIGHT * scale)), None))
+    return sorted(k for k in keys if os.path.exists(os.path.join("assets", k[0])))
+
+def _native_format():
+    """frombuffer/tobytes format string matching convert_alpha() surfaces, if there is one."""
+    masks = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()
+    little = sys.byteorder == "little"
+    if masks == (0xff0000, 0xff00, 0xff, 0xff000000):
+        return "BGRA" if little else "ARGB"
+    if masks == (0xff, 0xff00, 0xff0000, 0xff000000):
+        return "RGBA" if little else "ABGR"
+    return "RGBA"
+
+def pack_path(scale, textures=None):
+    """cache/assets.<height>.<hash>.pack; the hash covers the textures, their source files and the pixel format."""
+    textures = match_textures(scale) if textures is None else textures
+    h = hashlib.sha256()
+    h.update(repr((PACK_VERSION, _native_format(), textures)).encode())
+    for filename in sorted({t[0] for t in textures}):
+        st = os.stat(os.path.join("assets", filename))
+        h.update(f"{filename}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return os.path.join(PACK_DIR, f"assets.{int(settings.GAME_HEIGHT * scale)}.{h.hexdigest()[:12]}.pack")
+
+def build_pack(scale, path=None):
+    """Decode and scale every texture for `scale` (through load_texture) and write the pack."""
+    textures = match_textures(scale)
+    path = pack_path(scale, textures) if path is None else path
+    fmt = _native_format()
+    entries, blobs, offset = [], [], 0
+    for filename, size, fixed_height in textures:
+        img = load_texture(filename, size, fixed_height)
+        data = pygame.image.tobytes(img, fmt)
+        entries.append({"file": filename, "size": size, "fixed_height": fixed_height,
+                        "w": img.get_width(), "h": img.get_height(), "offset": offset})
+        blobs.append(data)
+        offset += len(data)
+    header = json.dumps({"version": PACK_VERSION, "format": fmt, "entries": entries}).encode()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(PACK_MAGIC + len(header).to_bytes(4, "little") + header)
+        for data in blobs:
+            f.write(data)
+    os.replace(tmp, path)
+    return path
+
+def load_pack(scale):
+    """Fill TEXTURE_CACHE for `scale` from its pack, building the pack first if
+    there is none yet. Returns the number of textures served from the pack."""
+    path = pack_path(scale)
+    if path in _PACK_MAPS:
+        return 0
+    if not os.path.exists(path):
+        build_pack(scale, path)
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[:len(PACK_MAGIC)] != PACK_MAGIC:
+        data.close()
+        return 0
+    header_len = int.from_bytes(data[len(PACK_MAGIC):len(PACK_MAGIC) + 4], "little")
+    base = len(PACK_MAGIC) + 4 + header_len
+    header = json.loads(data[len(PACK_MAGIC) + 4:base])
+    native = header["format"] == _native_format()
+    view = memoryview(data)
+    for e in header["entries"]:
+        start = base + e["offset"]
+        img = pygame.image.frombuffer(view[start:start + e["w"] * e["h"] * 4], (e["w"], e["h"]), header["format"])
+        if not native:
+            img = img.convert_alpha()
+        size = tuple(e["size"]) if e["size"] else None
+        TEXTURE_CACHE[(e["file"], size, e["fixed_height"])] = img
+    _PACK_MAPS[path] = data
+    return len(header["entries"])
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Pre-build the asset pack for one or more display heights")
+    parser.add_argument("--height", type=int, nargs="+", required=True, help="monitor height(s) in pixels")
+    args = parser.parse_args()
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    for height in args.height:
+        print(build_pack(height / settings.GAME_HEIGHT))
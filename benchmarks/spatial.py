@@ -0,0 +1,88 @@
+"""Spatial hash vs brute force for body collisions and target search.
+
+    python -m benchmarks.spatial
+
+For 50, 200 and 1000 bots scattered over the arena, times one tick's worth
+of (a) collision candidate checks for every bot and (b) "closest enemy
+within 800px" for every bot, with a plain loop over all players and with
+`spatial.SpatialHash` (including its per-tick rebuild).
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import time
+import numpy as np
+import settings
+import roster
+from entities import Gladiator
+from rng import MatchRandom
+from spatial import SpatialHash
+
+SIZES = (50, 200, 1000)
+REPEATS = 3
+
+
+def make_players(n, seed=0):
+    rng = np.random.default_rng(seed)
+    streams = MatchRandom(seed)
+    return [Gladiator(rng.uniform(0, settings.GAME_WIDTH), rng.uniform(0, settings.GAME_HEIGHT),
+                      i % 2, roster.ALL_BOTS[i % len(roster.ALL_BOTS)], rng=streams)
+            for i in range(n)]
+
+
+def brute_tick(players):
+    touching = 0
+    found = 0
+    for p in players:
+        for other in players:
+            if other is p: continue
+            if np.linalg.norm(p.pos - other.pos) < p.radius + other.radius:
+                touching += 1
+        best, best_dist = None, 800
+        for e in players:
+            if e.team_id == p.team_id: continue
+            d = np.linalg.norm(e.pos - p.pos)
+            if d < best_dist:
+                best, best_dist = e, d
+        found += best is not None
+    return touching, found
+
+
+def grid_tick(players, grid):
+    grid.rebuild(players)
+    touching = 0
+    found = 0
+    for p in players:
+        for other in grid.query(p.pos, p.radius * 2):
+            if other is p: continue
+            if np.linalg.norm(p.pos - other.pos) < p.radius + other.radius:
+                touching += 1
+        for d, e in grid.iter_by_distance(p.pos, 800):
+            if e.team_id != p.team_id:
+                found += 1
+                break
+    return touching, found
+
+
+def best_time(fn, *args):
+    best = float("inf")
+    result = None
+    for _ in range(REPEATS):
+        t = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t)
+    return best, result
+
+
+def main():
+    print(f"{'bots':>6} {'brute ms/tick':>14} {'grid ms/tick':>13} {'speedup':>8}")
+    for n in SIZES:
+        players = make_players(n)
+        brute_s, brute_res = best_time(brute_tick, players)
+        grid_s, grid_res = best_time(grid_tick, players, SpatialHash())
+        assert brute_res == grid_res, (brute_res, grid_res)
+        print(f"{n:>6} {brute_s * 1000:>14.1f} {grid_s * 1000:>13.1f} {brute_s / grid_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
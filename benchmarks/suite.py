@@ -0,0 +1,297 @@
+"""Reproducible simulation benchmark suite.
+
+    python -m benchmarks.suite run                   # all scenarios, appended to the history
+    python -m benchmarks.suite run 1v15 crowd200 --label "sdf steering"
+    python -m benchmarks.suite compare               # latest run vs the one before it
+    python -m benchmarks.suite compare -2 -1 --threshold 0.05
+    python -m benchmarks.suite list
+
+Scenarios are scripted and seeded, so every run simulates exactly the same
+ticks:
+
+    1v15        the live lineup (roster.TEAM_GREEN_NAMES vs TEAM_RED_NAMES)
+    4v4         team fights drawn from roster.ALL_BOTS
+    4v4-batched the same fights with Match(batch_sight=True): one batched
+                line-of-sight call per team per tick instead of per-bot scans
+    ffa8        all eight franchises in one free-for-all
+    crowd50/200/1000   world.make_crowd on the Warehouse geometry
+
+Each scenario runs in a fresh process. The best of REPEATS clean passes gives
+ticks/sec; a final instrumented pass collects per-phase ms/tick (see profiler.py) and
+wall-query call counts per tick. Peak RSS is the process high-water mark.
+Results are appended to a JSON history file, and `compare` flags every
+metric that got worse by more than the threshold (exit status 1 if any did).
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import multiprocessing
+from collections import Counter
+from functools import wraps
+
+HISTORY_PATH = os.path.join("cache", "benchmarks.json")
+DEFAULT_THRESHOLD = 0.10
+# Clean passes per scenario; the fastest one is reported
+REPEATS = 3
+# Phase costs below this many ms/tick are too small to call a regression
+PHASE_NOISE_MS = 0.02
+
+
+# --- SCENARIOS ---
+# Each scenario yields (simulation, tick limit) pairs; building them isn't timed
+def lineup_matches(seeds=range(1, 9), max_ticks=3600):
+    import roster
+    from match import Match
+    for seed in seeds:
+        yield Match([roster.TEAM_GREEN_NAMES, roster.TEAM_RED_NAMES], seed=seed, max_ticks=max_ticks), max_ticks
+
+def team_matches(games=4, team_size=4, max_ticks=3600, seed=0, batch_sight=False):
+    import roster
+    from match import Match
+    rng = random.Random(seed)
+    names = [b.name for b in roster.ALL_BOTS]
+    for game in range(games):
+        picked = rng.sample(names, team_size * 2)
+        yield Match([picked[:team_size], picked[team_size:]], seed=seed + game, max_ticks=max_ticks,
+                    batch_sight=batch_sight), max_ticks
+
+def free_for_all_matches(seeds=(1, 2), max_ticks=3600):
+    import roster
+    from match import Match
+    for seed in seeds:
+        yield Match([names for _, _, names in roster.free_for_all()], seed=seed, max_ticks=max_ticks), max_ticks
+
+def crowd(n, ticks, seed=0):
+    import world
+    yield world.make_crowd(n, seed=seed), ticks
+
+
+SCENARIOS = {
+    "1v15": lambda: lineup_matches(),
+    "4v4": lambda: team_matches(),
+    "4v4-batched": lambda: team_matches(batch_sight=True),
+    "ffa8": lambda: free_for_all_matches(),
+    "crowd50": lambda: crowd(50, 600),
+    "crowd200": lambda: crowd(200, 200),
+    "crowd1000": lambda: crowd(1000, 20),
+}
+
+
+def finished(sim):
+    if hasattr(sim, "finished"):
+        return sim.finished
+    return len(sim.teams_alive()) <= 1
+
+
+# --- CALL COUNTERS ---
+def counted_calls():
+    """Wrap the wall / body queries so each call (or each batched item) is counted."""
+    import vision
+    import physics
+    import spatial
+    counts = Counter()
+    targets = [
+        (vision, "check_line_of_sight", None),
+        (vision, "cast_ray", None),
+        (vision, "line_of_sight_batch", 0),      # counts rays, not calls
+        (physics.EdgeGrid, "circle_pushes", None),
+        (physics.EdgeGrid, "circle_hits", None),
+        (physics.EdgeGrid, "resolve_circles", 1),  # counts circles (arg 0 is self)
+        (spatial.SpatialHash, "query", None),
+    ]
+    for owner, name, batch_arg in targets:
+        fn = getattr(owner, name)
+
+        def wrapper(*args, _fn=fn, _name=name, _batch=batch_arg, **kwargs):
+            counts[_name] += 1 if _batch is None else len(args[_batch])
+            return _fn(*args, **kwargs)
+        setattr(owner, name, wraps(fn)(wrapper))
+    return counts
+
+
+# --- RUNNING ---
+def play(scenario, prof=None):
+    """Run a scenario; returns (ticks, seconds spent stepping)."""
+    ticks = 0
+    elapsed = 0.0
+    for sim, limit in SCENARIOS[scenario]():
+        sim_ticks = 0
+        start = time.perf_counter()
+        while sim_ticks < limit and not finished(sim):
+            sim.step()
+            sim_ticks += 1
+            if prof: prof.end_frame()
+        elapsed += time.perf_counter() - start
+        ticks += sim_ticks
+    return ticks, elapsed
+
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def warm_up(scenario):
+    """Build the scenario's first simulation and step it once, then discard it, so
+    map tables and imports are loaded before anything is timed."""
+    sim, _ = next(iter(SCENARIOS[scenario]()))
+    sim.step()
+
+
+def measure(scenario, repeats=REPEATS):
+    """Runs in a fresh process: `repeats` clean passes, then one instrumented pass."""
+    import profiler
+    warm_up(scenario)
+    ticks, seconds = min((play(scenario) for _ in range(repeats)), key=lambda run: run[1])
+
+    counts = counted_calls()
+    profiler.current = prof = profiler.Profiler(window=ticks + 1, trace_frames=1)
+    play(scenario, prof)
+    profiler.current = None
+
+    phases = {phase: sum(values) / ticks for phase, values in prof.totals.items() if phase != "frame"}
+    return {
+        "ticks": ticks,
+        "seconds": round(seconds, 3),
+        "ticks_per_sec": round(ticks / seconds, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "phase_ms_per_tick": {k: round(v, 4) for k, v in sorted(phases.items())},
+        "calls_per_tick": {k: round(v / ticks, 2) for k, v in sorted(counts.items())},
+    }
+
+
+def git_revision():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scenarios, label=None, repeats=REPEATS, log=print):
+    from match import ENGINE_VERSION
+    record = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "label": label,
+        "git": git_revision(),
+        "engine_version": ENGINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "repeats": repeats,
+        "scenarios": {},
+    }
+    # A fresh interpreter per scenario keeps peak RSS and warm caches from leaking between them
+    ctx = multiprocessing.get_context("spawn")
+    for name in scenarios:
+        with ctx.Pool(1) as pool:
+            result = pool.apply(measure, (name, repeats))
+        record["scenarios"][name] = result
+        log(f"{name:<10} {result['ticks']:>6} ticks {result['ticks_per_sec']:>9.1f} ticks/s "
+            f"{result['peak_rss_mb']:>7.1f} MB peak")
+    return record
+
+
+# --- HISTORY ---
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_history(history, path):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD, log=print):
+    """Print metric changes between two history records; returns the number of regressions."""
+    def tag(rec):
+        return f"{rec['time']} {rec.get('git') or ''} {rec.get('label') or ''}".strip()
+
+    log(f"old: {tag(old)}\nnew: {tag(new)}")
+    if old.get("engine_version") != new.get("engine_version"):
+        log(f"note: engine version {old.get('engine_version')} -> {new.get('engine_version')}, "
+            "simulated ticks differ so per-tick numbers are not like for like")
+    regressions = 0
+    for name, n in new["scenarios"].items():
+        o = old["scenarios"].get(name)
+        if o is None:
+            continue
+        # (metric, old, new, higher is better, noise floor)
+        rows = [("ticks/s", o["ticks_per_sec"], n["ticks_per_sec"], True, 0.0),
+                ("peak MB", o["peak_rss_mb"], n["peak_rss_mb"], False, 0.0)]
+        for phase, value in n["phase_ms_per_tick"].items():
+            rows.append((f"{phase} ms", o["phase_ms_per_tick"].get(phase, 0.0), value, False, PHASE_NOISE_MS))
+        for query, value in n["calls_per_tick"].items():
+            rows.append((f"{query}/tick", o["calls_per_tick"].get(query, 0.0), value, False, 0.0))
+
+        log(f"\n{name}")
+        for metric, before, after, higher_better, noise in rows:
+            change = (after - before) / before if before else (0.0 if after == before else float("inf"))
+            worse = -change if higher_better else change
+            flag = ""
+            if worse > threshold and abs(after - before) > noise:
+                flag = "  REGRESSION"
+                regressions += 1
+            elif -worse > threshold and abs(after - before) > noise:
+                flag = "  improved"
+            log(f"  {metric:<28} {before:>10.3f} -> {after:>10.3f}  {change:>+7.1%}{flag}")
+    log(f"\n{regressions} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproducible simulation benchmarks")
+    parser.add_argument("--history", default=HISTORY_PATH, help=f"history file (default: {HISTORY_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="run scenarios and append the results to the history")
+    run_p.add_argument("scenarios", nargs="*", metavar="SCENARIO",
+                       help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    run_p.add_argument("--label", default=None, help="note stored with the run")
+    run_p.add_argument("--repeats", type=int, default=REPEATS, help="clean passes per scenario (best is kept)")
+    run_p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    cmp_p = sub.add_parser("compare", help="compare two runs from the history")
+    cmp_p.add_argument("old", nargs="?", type=int, default=-2, help="history index (default -2)")
+    cmp_p.add_argument("new", nargs="?", type=int, default=-1, help="history index (default -1)")
+    cmp_p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    sub.add_parser("list", help="list recorded runs")
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    if args.command == "run":
+        unknown = [name for name in args.scenarios if name not in SCENARIOS]
+        if unknown:
+            parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+        record = run(args.scenarios or list(SCENARIOS), label=args.label, repeats=args.repeats)
+        history.append(record)
+        save_history(history, args.history)
+        if len(history) > 1:
+            print()
+            compare(history[-2], record, args.threshold)
+    elif args.command == "compare":
+        if len(history) < 2:
+            sys.exit(f"need at least two runs in {args.history}")
+        sys.exit(1 if compare(history[args.old], history[args.new], args.threshold) else 0)
+    else:
+        for i, rec in enumerate(history):
+            print(f"{i:>3}  {rec['time']}  {rec.get('git') or '-':<14} engine {rec.get('engine_version')}  "
+                  f"{', '.join(rec['scenarios'])}  {rec.get('label') or ''}")
+
+
+if __name__ == "__main__":
+    main()
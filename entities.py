@@ -1,61 +1,58 @@
-import pygame
 import numpy as np
 import math
-import random
 import settings
+from rng import MatchRandom
 import physics
 import vision
-import assets_manager
-import sound_manager
+import profiler
+from event_log import log_event
+
+# How far bots look for enemies
+SIGHT_RANGE = 800
+# Share of its velocity a bot keeps each reference tick
+FRICTION = 0.9
 
 
 def is_point_free(pt, polygons_list, radius=25):
     """Return True if a circle at `pt` with `radius` does not intersect any polygon.
+    `polygons_list` may be a plain polygon list or a `physics.EdgeGrid`.
     Conservative: any exception returns False.
     """
     try:
         if polygons_list is None:
             polygons_list = []
-        for poly in polygons_list:
-            hit, _ = physics.resolve_circle_polygon(np.array(pt), radius, poly)
-            if hit:
+        if isinstance(polygons_list, physics.EdgeGrid):
+            if polygons_list.sdf is not None:
+                if polygons_list.sdf.distance(pt) < radius:
+                    return False
+            elif polygons_list.circle_hits(pt, radius):
                 return False
+        elif physics.circle_pushes(np.array(pt), radius, polygons_list):
+            return False
         if not (0 + 10 < pt[0] < settings.GAME_WIDTH - 10 and 0 + 10 < pt[1] < settings.GAME_HEIGHT - 10):
             return False
         return True
     except Exception:
         return False
 
-class Particle:
-    def __init__(self, x, y, color, speed, size=5):
-        self.x, self.y = x, y
-        angle = random.uniform(0, 6.28)
-        self.vx = math.cos(angle) * speed
-        self.vy = math.sin(angle) * speed
-        self.life = 1.0
-        self.decay = 0.05 + random.uniform(0, 0.05)
-        self.color = color
-        self.size = size
-        
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.life -= self.decay
-        self.size *= 0.9
-        
-    def draw(self, surface):
-        if self.life > 0:
-            s = pygame.Surface((int(self.size*2), int(self.size*2)), pygame.SRCALPHA)
-            pygame.draw.circle(s, (*self.color, int(self.life*255)), (int(self.size), int(self.size)), int(self.size))
-            surface.blit(s, (self.x - self.size, self.y - self.size))
+def points_free(points, geometry, radius=25):
+    """Vectorized `is_point_free` for an (n, 2) array of points against an EdgeGrid."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    in_bounds = ((10 < points[:, 0]) & (points[:, 0] < settings.GAME_WIDTH - 10) &
+                 (10 < points[:, 1]) & (points[:, 1] < settings.GAME_HEIGHT - 10))
+    if geometry.sdf is not None:
+        return in_bounds & (geometry.sdf.distances(points) >= radius)
+    return in_bounds & geometry.circles_free(points, radius)
 
 class Gladiator:
-    def __init__(self, x, y, team_id, stats):
+    def __init__(self, x, y, team_id, stats, rng=None):
         self.pos = np.array([float(x), float(y)])
         self.vel = np.array([0.0, 0.0])
         self.team_id = team_id
         
         self.stats = stats
+        # Shared per-match random streams (see rng.py); a fresh seed if not given
+        self.rng = rng if rng is not None else MatchRandom()
         self.name = stats.name
         self.max_hp = stats.hp
         self.hp = stats.hp
@@ -74,8 +71,9 @@ class Gladiator:
         self.accuracy = stats.accuracy
         self.melee_bias = stats.melee_bias
         
-        self.base_image = assets_manager.load_texture(stats.image_file, size=(60, 60))
-        self.image = self.base_image
+        # Sprites are attached by the renderer; the simulation never needs them
+        self.base_image = None
+        self.image = None
         
         self.radius = 25
         
@@ -98,7 +96,7 @@ class Gladiator:
         self.escape_dir = np.array([0.0, 0.0])
         self.stuck_reported = False
         self.stuck_origin = None 
-        self.walk_sound_timer = random.randint(0, 9)
+        self.walk_sound_timer = self.rng.cosmetic.randint(0, 9)
         self.move_target = None 
         self.avoid_bias = 1
         
@@ -106,47 +104,35 @@ class Gladiator:
 
         # --- PERFORMANCE OPTIMIZATION VARS ---
         # Random start so bots don't all "think" on the exact same frame
-        self.scan_timer = random.randint(0, 10) 
-        self.cached_polygons = []
-        self.last_poly_update_pos = np.array([-999.0, -999.0])
+        self.scan_timer = self.rng.ai.randint(0, 10) 
         self.current_target = None # Memorize target to avoid re-scanning
         # -------------------------------------
 
-    def logic(self, enemies, all_players, polygons, particles, kill_feed):
+    def logic(self, enemies, all_players, geometry, events, grid=None, sight=None):
         if not self.alive: return
+        # Phase timers for the frame profiler (profiler.current is None when it's off)
+        prof = profiler.current
+        if prof: t = prof.now()
+
+        # Timers, speeds and chances below are per reference tick (settings.BASE_SIM_HZ);
+        # dt is how many of those this tick covers
+        dt = settings.TICK_SCALE
 
         if self.warmup_timer > 0:
-            self.warmup_timer -= 1
-
-        # --- OPTIMIZATION 1: Cache Nearby Polygons ---
-        # Only recalculate 'nearby' walls if we have moved > 100px from last check
-        # This reduces list iterations significantly.
-        dist_since_update = np.linalg.norm(self.pos - self.last_poly_update_pos)
-        if dist_since_update > 100:
-            self.cached_polygons = []
-            box_size = 400 # Slightly larger box to account for caching
-            px, py = self.pos
-            for poly in polygons:
-                xs = [p[0] for p in poly]
-                ys = [p[1] for p in poly]
-                cx = (min(xs) + max(xs)) / 2.0
-                cy = (min(ys) + max(ys)) / 2.0
-                if abs(px - cx) < box_size and abs(py - cy) < box_size:
-                    self.cached_polygons.append(poly)
-            self.last_poly_update_pos = self.pos.copy()
-        
-        nearby_polygons = self.cached_polygons
-        # ----------------------------------------------
+            self.warmup_timer -= dt
+
+        # `geometry` is the map's physics.EdgeGrid: every wall query below only
+        # touches the edges in the grid cells it overlaps.
 
         # --- Stuck detection ---
         dist = np.linalg.norm(self.pos - self.last_pos)
-        if dist < 0.5:
+        if dist < 0.5 * dt:
             if self.escape_timer <= 0:
-                self.stuck_timer += 1
+                self.stuck_timer += dt
             else:
-                self.stuck_timer = min(self.stuck_timer + 0.5, 100)
+                self.stuck_timer = min(self.stuck_timer + 0.5 * dt, 100)
         else:
-            self.stuck_timer = max(0, self.stuck_timer - 2)
+            self.stuck_timer = max(0, self.stuck_timer - 2 * dt)
             if self.stuck_origin is not None and np.linalg.norm(self.pos - self.stuck_origin) > 50:
                 self.stuck_timer = 0
                 self.stuck_reported = False
@@ -160,25 +146,14 @@ class Gladiator:
             if not self.stuck_reported:
                 self.stuck_origin = self.pos.copy()
                 self.stuck_reported = True
+                log_event(events, "stuck", self.name, pos=self.pos, value=self.stuck_timer)
             
-            normal = np.array([1.0, 0.0]) # Default fallback
-            best_dist = 9999
-            
-            # Use cached polygons for escape logic too
-            for poly in nearby_polygons:
-                for i in range(len(poly)):
-                    p1 = np.array(poly[i])
-                    p2 = np.array(poly[(i+1) % len(poly)])
-                    edge = p2 - p1
-                    elen2 = np.dot(edge, edge)
-                    if elen2 == 0: continue
-                    t = max(0, min(1, np.dot(self.pos - p1, edge) / elen2))
-                    closest = p1 + t * edge
-                    vect = self.pos - closest
-                    d = np.linalg.norm(vect)
-                    if d < best_dist and d > 1e-6:
-                        best_dist = d
-                        normal = vect / d
+            # Push away from the closest wall (straight down the distance field when there is one)
+            if geometry.sdf is not None:
+                normal = geometry.sdf.gradient(self.pos)
+            else:
+                normal = geometry.nearest_edge_normal(self.pos)
+            if normal is None: normal = np.array([1.0, 0.0]) # Default fallback
             
             self.escape_dir = normal / (np.linalg.norm(normal) + 1e-6)
             self.escape_timer = 20
@@ -187,10 +162,20 @@ class Gladiator:
                 self.vel += self.escape_dir * nudge
                 self.escape_timer = max(self.escape_timer, 40)
 
+        if prof: t = prof.lap("logic.stuck", t, self.name)
+
+        # `sight` maps enemies to the line-of-sight answers the match batched for
+        # this bot at the start of the tick; anyone missing from it is raycast here
+        def can_see(e):
+            visible = sight.get(e) if sight is not None else None
+            if visible is None:
+                visible = vision.check_line_of_sight(self.pos, e.pos, geometry)
+            return visible
+
         # --- OPTIMIZATION 2: Throttled Target Finding ---
         # 1. Decrement timer
         if self.scan_timer > 0:
-            self.scan_timer -= 1
+            self.scan_timer -= dt
         
         # 2. If we have a target, check if it's still valid (fast check)
         closest_visible_enemy = self.current_target
@@ -198,10 +183,10 @@ class Gladiator:
         
         if closest_visible_enemy and closest_visible_enemy.alive:
              dist_to_target = np.linalg.norm(closest_visible_enemy.pos - self.pos)
-             if dist_to_target < 800:
+             if dist_to_target < SIGHT_RANGE:
                  # Only do the expensive raycast if the timer is 0 OR every few frames
-                 if self.scan_timer == 0:
-                     if vision.check_line_of_sight(self.pos, closest_visible_enemy.pos, nearby_polygons):
+                 if self.scan_timer <= 0:
+                     if can_see(closest_visible_enemy):
                          target_is_valid = True
                  else:
                      # Assume validity between scans to save FPS
@@ -216,34 +201,48 @@ class Gladiator:
         if closest_visible_enemy:
             min_vis_dist = np.linalg.norm(closest_visible_enemy.pos - self.pos)
             
-        if self.scan_timer == 0 and closest_visible_enemy is None:
+        if self.scan_timer <= 0 and closest_visible_enemy is None:
             # Reset timer (randomized slightly to prevent all bots scanning frame 10, 20, 30...)
-            self.scan_timer = 6 + random.randint(0, 3) 
+            self.scan_timer = 6 + self.rng.ai.randint(0, 3) 
             
-            for e in enemies:
-                if not e.alive: continue
-                dist = np.linalg.norm(e.pos - self.pos)
-                if dist < 800 and dist < min_vis_dist:
-                    # Expensive Check
-                    if vision.check_line_of_sight(self.pos, e.pos, nearby_polygons):
+            if grid is not None:
+                # Candidates come nearest-first, so the first one in sight is the closest visible
+                for dist, e in grid.iter_by_distance(self.pos, SIGHT_RANGE):
+                    if e.team_id == self.team_id or not e.alive: continue
+                    if can_see(e):
                         min_vis_dist = dist
                         closest_visible_enemy = e
+                        break
+            else:
+                for e in enemies:
+                    if not e.alive: continue
+                    dist = np.linalg.norm(e.pos - self.pos)
+                    if dist < SIGHT_RANGE and dist < min_vis_dist:
+                        # Expensive Check
+                        if can_see(e):
+                            min_vis_dist = dist
+                            closest_visible_enemy = e
             
             self.current_target = closest_visible_enemy
         # ------------------------------------------------
+        if prof: t = prof.lap("logic.targets", t, self.name)
 
         # 3. PICK MOVE TARGET
         move_target = self.pos.copy()
         self.move_target = move_target 
 
         if self.stuck_timer > 30:
-            if self.wander_target is None or self.stuck_timer % 30 == 0:
-                self.wander_target = self.find_reachable_wander(nearby_polygons) 
+            # Fresh wander target every 30 ticks stuck (within half a timer step of a multiple)
+            if self.wander_target is None or self.stuck_timer % 30 < 0.5 * dt:
+                self.wander_target = self.find_reachable_wander(geometry) 
             move_target = self.wander_target
 
         elif not self.has_weapon and self.weapon_pos is not None:
+            if geometry.nav is not None:
+                # The nav grid routes around walls, no flanking needed
+                move_target = self.weapon_pos
             # Check LOS to weapon less frequently? No, this is rare state, keep it accurate
-            if vision.check_line_of_sight(self.pos, self.weapon_pos, nearby_polygons):
+            elif vision.check_line_of_sight(self.pos, self.weapon_pos, geometry):
                 move_target = self.weapon_pos
             else:
                 # Flanking Logic (kept same)
@@ -254,8 +253,8 @@ class Gladiator:
                     perp = np.array([-dir_to[1], dir_to[0]]) 
                     flank_left = self.pos + (perp * 60) + (dir_to * 20)
                     flank_right = self.pos - (perp * 60) + (dir_to * 20)
-                    left_free = is_point_free(flank_left, nearby_polygons, self.radius)
-                    right_free = is_point_free(flank_right, nearby_polygons, self.radius)
+                    left_free = is_point_free(flank_left, geometry, self.radius)
+                    right_free = is_point_free(flank_right, geometry, self.radius)
                     
                     if left_free and not right_free: move_target = flank_left
                     elif right_free and not left_free: move_target = flank_right
@@ -283,7 +282,7 @@ class Gladiator:
                 perp = np.array([-vec[1], vec[0]])
                 if self.escape_timer > 0: perp = perp * 0.0 + (-vec) * 0.2
 
-                if self.strafe_cooldown <= 0 and random.random() < self.strafe_rate:
+                if self.strafe_cooldown <= 0 and self.rng.ai.random() < 1 - (1 - self.strafe_rate) ** dt:
                     self.strafe_dir *= -1
                     self.strafe_cooldown = 14 
 
@@ -293,24 +292,27 @@ class Gladiator:
                 dist_factor = (min_vis_dist - target_dist) * 0.01
                 candidate = self.pos + (perp * self.strafe_dir) + (vec * dist_factor)
 
-                if not is_point_free(candidate, nearby_polygons, self.radius):
+                if not is_point_free(candidate, geometry, self.radius):
                     candidate2 = self.pos + (perp * -self.strafe_dir) + (vec * dist_factor)
-                    if is_point_free(candidate2, nearby_polygons, self.radius):
+                    if is_point_free(candidate2, geometry, self.radius):
                         self.strafe_dir *= -1 
                         candidate = candidate2
                         self.strafe_cooldown = 14
                     else:
                         escape = self.pos - (vec / (np.linalg.norm(vec)+1e-6)) * 30
-                        if is_point_free(escape, nearby_polygons, self.radius):
+                        if is_point_free(escape, geometry, self.radius):
                             candidate = escape
                         else:
-                            candidate = self.find_reachable_wander(nearby_polygons)
+                            candidate = self.find_reachable_wander(geometry)
 
                 move_target = candidate
 
         else:
             if self.patrol_target is None or np.linalg.norm(self.pos - self.patrol_target) < 50:
-                self.patrol_target = np.array([random.uniform(50, settings.GAME_WIDTH-50), random.uniform(50, settings.GAME_HEIGHT-50)])
+                if geometry.nav is not None:
+                    self.patrol_target = geometry.nav.random_point(self.rng.ai)
+                else:
+                    self.patrol_target = np.array([self.rng.ai.uniform(50, settings.GAME_WIDTH-50), self.rng.ai.uniform(50, settings.GAME_HEIGHT-50)])
             move_target = self.patrol_target
 
         self.move_target = move_target
@@ -325,19 +327,19 @@ class Gladiator:
                 desired_dir = self.escape_dir
                 step = 10.0
                 test = self.pos + desired_dir * step
-                blocked = not is_point_free(test, nearby_polygons, self.radius)
+                blocked = not is_point_free(test, geometry, self.radius)
 
                 if blocked:
                     slide_x = np.array([desired_dir[0], 0.0])
                     if np.linalg.norm(slide_x) > 0:
                         test = self.pos + slide_x * step
-                        if is_point_free(test, nearby_polygons, self.radius):
+                        if is_point_free(test, geometry, self.radius):
                             desired_dir = slide_x / np.linalg.norm(slide_x)
                         else:
                             slide_y = np.array([0.0, desired_dir[1]])
                             if np.linalg.norm(slide_y) > 0:
                                 test = self.pos + slide_y * step
-                                if is_point_free(test, nearby_polygons, self.radius):
+                                if is_point_free(test, geometry, self.radius):
                                     desired_dir = slide_y / np.linalg.norm(slide_y)
                                 else:
                                     perp = np.array([-desired_dir[1], desired_dir[0]])
@@ -350,11 +352,13 @@ class Gladiator:
                     else:
                         desired_dir = np.array([0.0, 0.0])
             else:
-                look_ahead = self.pos + desired_dir * 50
-                # Use cached polygons for raycast
-                blocked_ahead = vision.cast_ray(self.pos, look_ahead, nearby_polygons) 
-
-                if blocked_ahead:
+                if geometry.nav is not None:
+                    # Next hop along the precomputed shortest path replaces the look-ahead + fan sweep
+                    route_dir = geometry.nav.direction(self.pos, move_target)
+                    if route_dir is not None:
+                        desired_dir = route_dir
+                elif vision.cast_ray(self.pos, self.pos + desired_dir * 50, geometry):
+                    # No nav table: look 50px ahead and fan out around whatever blocks it
                     if self.avoid_bias == 1:
                         check_angles = [45, 90, 135, -45, -90, -135]
                     else:
@@ -365,7 +369,7 @@ class Gladiator:
                         test_dir = physics.rotate_vector(desired_dir, angle)
                         test_look = self.pos + test_dir * 50
                         
-                        if not vision.cast_ray(self.pos, test_look, nearby_polygons) and is_point_free(self.pos + test_dir*15, nearby_polygons, self.radius):
+                        if not vision.cast_ray(self.pos, test_look, geometry) and is_point_free(self.pos + test_dir*15, geometry, self.radius):
                             desired_dir = test_dir
                             found_path = True
                             if angle > 0: self.avoid_bias = 1
@@ -375,22 +379,22 @@ class Gladiator:
                     if not found_path:
                         desired_dir = -desired_dir
                         small_escape = self.pos + np.array([-desired_dir[1], desired_dir[0]]) * 15
-                        if is_point_free(small_escape, nearby_polygons, self.radius):
+                        if is_point_free(small_escape, geometry, self.radius):
                             desired_dir = (small_escape - self.pos) / (np.linalg.norm(small_escape - self.pos) + 1e-6)
 
                 step = 10.0
                 test = self.pos + desired_dir * step
-                blocked = not is_point_free(test, nearby_polygons, self.radius)
+                blocked = not is_point_free(test, geometry, self.radius)
 
                 if blocked:
                     slide_x = np.array([desired_dir[0], 0.0])
                     test = self.pos + slide_x * step
-                    if is_point_free(test, nearby_polygons, self.radius) and np.linalg.norm(slide_x) > 0:
+                    if is_point_free(test, geometry, self.radius) and np.linalg.norm(slide_x) > 0:
                         desired_dir = slide_x / (np.linalg.norm(slide_x) + 1e-6)
                     else:
                         slide_y = np.array([0.0, desired_dir[1]])
                         test = self.pos + slide_y * step
-                        if is_point_free(test, nearby_polygons, self.radius) and np.linalg.norm(slide_y) > 0:
+                        if is_point_free(test, geometry, self.radius) and np.linalg.norm(slide_y) > 0:
                             desired_dir = slide_y / (np.linalg.norm(slide_y) + 1e-6)
                         else:
                             perp = np.array([-desired_dir[1], desired_dir[0]])
@@ -400,9 +404,11 @@ class Gladiator:
                                 desired_dir = np.array([0.0, 0.0])            
             
             if np.linalg.norm(desired_dir) < 1e-3:
-                self.vel *= 0.5
+                self.vel *= 0.5 ** dt
             else:
-                self.vel += desired_dir * self.speed
+                self.vel += desired_dir * self.speed * dt
+
+        if prof: t = prof.lap("logic.steering", t, self.name)
 
         # 5. AIMING & ATTACK
         if closest_visible_enemy:
@@ -415,40 +421,40 @@ class Gladiator:
                 self.damage_dealt += self.melee_dmg
                 self.cooldown = 30
                 self.swing_timer = 15
-                sound_manager.play_swing()
-                
-                for _ in range(5):
-                    particles.append(Particle(closest_visible_enemy.pos[0], closest_visible_enemy.pos[1], (255, 0, 0), 4))
+                events.append(("sound", "swing"))
+                events.append(("particles", closest_visible_enemy.pos[0], closest_visible_enemy.pos[1], (255, 0, 0), 4, 5))
+                log_event(events, "melee", self.name, closest_visible_enemy.name, self.pos, self.melee_dmg)
                 
                 if closest_visible_enemy.hp <= 0:
                     closest_visible_enemy.alive = False
                     self.kills += 1
-                    try: sound_manager.play_death()
-                    except: pass
-                    kill_feed.append(f"{self.name} STABBED {closest_visible_enemy.name}")
+                    events.append(("sound", "death"))
+                    events.append(("kill", self.name, "STABBED", closest_visible_enemy.name))
+                    log_event(events, "death", closest_visible_enemy.name, self.name, closest_visible_enemy.pos, "STABBED")
                 else:
-                    try: sound_manager.play_collision()
-                    except: pass
+                    events.append(("sound", "collision"))
 
             # B. RANGED ATTACK
             else:
                 can_throw_time = self.warmup_timer <= 0
-                wants_to_throw = random.random() > self.melee_bias
+                wants_to_throw = self.rng.ai.random() > self.melee_bias ** dt
 
                 if self.has_weapon and wants_to_throw and self.cooldown <= 0 and min_vis_dist < 800 and wants_to_throw:
+                    # Lead by 15 reference ticks (velocities are per reference tick)
                     lead_pos = closest_visible_enemy.pos + (closest_visible_enemy.vel * 15)
                     aim_vec = lead_pos - self.pos
                     base_angle = math.atan2(aim_vec[1], aim_vec[0])
                     
                     jitter = (1.0 - self.accuracy) * 0.5
-                    final_angle = base_angle + random.uniform(-jitter, jitter)
+                    final_angle = base_angle + self.rng.aim.uniform(-jitter, jitter)
                     
                     self.has_weapon = False
                     self.weapon_flying = True
                     self.weapon_pos = self.pos.copy()
                     self.weapon_dir = np.array([math.cos(final_angle), math.sin(final_angle)])
                     
-                    sound_manager.play_throw()
+                    events.append(("sound", "throw"))
+                    log_event(events, "throw", self.name, closest_visible_enemy.name, self.pos, round(final_angle, 3))
                     self.cooldown = self.max_cooldown
 
         else:
@@ -457,19 +463,27 @@ class Gladiator:
                 diff = target_angle - self.angle
                 while diff > math.pi: diff -= 2 * math.pi
                 while diff < -math.pi: diff += 2 * math.pi
-                self.angle += diff * 0.2
+                self.angle += diff * (1 - 0.8 ** dt)
+
+        if prof: t = prof.lap("logic.attack", t, self.name)
 
         # 6. FRICTION & MOVEMENT
-        self.vel *= 0.9
-        self.pos += self.vel
+        self.vel *= FRICTION ** dt
+        self.pos += self.vel * dt
 
-        if self.strafe_cooldown > 0: self.strafe_cooldown -= 1
-        if self.escape_timer > 0: self.escape_timer -= 1
+        if self.strafe_cooldown > 0: self.strafe_cooldown -= dt
+        if self.escape_timer > 0: self.escape_timer -= dt
 
-        # 7. PHYSICS RESOLUTION (Collisions)
+        # 7. PHYSICS RESOLUTION (Body collisions; walls are resolved for every bot
+        # at once after the tick's logic, see Match._resolve_walls)
+        if grid is not None:
+            # Bodies share one radius; the margin covers movement since the grid was rebuilt
+            nearby_players = grid.query(self.pos, self.radius * 2 + 20)
+        else:
+            nearby_players = all_players
         for _ in range(4):
             hit_something = False
-            for other in all_players:
+            for other in nearby_players:
                 if other is self or not other.alive: continue
                 diff = self.pos - other.pos
                 dist = np.linalg.norm(diff)
@@ -481,95 +495,38 @@ class Gladiator:
                     self.pos += push * (overlap * 0.5)
                     hit_something = True
 
-            # Use cached polygons for collision resolution too
-            for poly in nearby_polygons:
-                hit, push = physics.resolve_circle_polygon(self.pos, self.radius, poly)
-                if hit:
-                    self.pos += push
-                    normal = push / np.linalg.norm(push)
-                    dot = np.dot(self.vel, normal)
-                    if dot < 0: 
-                        self.vel = self.vel - 1.0 * dot * normal
-                    hit_something = True
-
             self.pos[0] = np.clip(self.pos[0], 0, settings.GAME_WIDTH)
             self.pos[1] = np.clip(self.pos[1], 0, settings.GAME_HEIGHT)
 
             if not hit_something: break
 
-        if self.cooldown > 0: self.cooldown -= 1
-        if self.swing_timer > 0: self.swing_timer -= 1
-
-    def find_reachable_wander(self, polygons):
-        for _ in range(20):
-            p = np.array([
-                random.uniform(50, settings.GAME_WIDTH-50),
-                random.uniform(50, settings.GAME_HEIGHT-50)
-            ])
-            if is_point_free(p, polygons, radius=20):
-                return p
+        if self.cooldown > 0: self.cooldown -= dt
+        if self.swing_timer > 0: self.swing_timer -= dt
+        if prof: prof.lap("logic.collision", t, self.name)
+
+    def find_reachable_wander(self, geometry):
+        if geometry.nav is not None:
+            return geometry.nav.random_point(self.rng.ai)
+        # Draw all 20 candidates up front and test them in one batched pass
+        candidates = np.array([
+            (self.rng.ai.uniform(50, settings.GAME_WIDTH-50), self.rng.ai.uniform(50, settings.GAME_HEIGHT-50))
+            for _ in range(20)
+        ])
+        free = np.flatnonzero(points_free(candidates, geometry, radius=20))
+        if len(free):
+            return candidates[free[0]]
         return self.pos.copy()
 
-    def update_weapon(self, polygons, enemies, particles, kill_feed):
+    def update_weapon(self, events):
+        """Drop a dead bot's weapon, or pick it back up once it's lying close by.
+        Weapons in flight are moved and hit-tested by `projectiles.Projectiles`."""
         if not self.alive:
             self.weapon_flying = False
             self.weapon_pos = None
             return
-        
-        if self.weapon_flying:
-            speed = 10 
-            self.weapon_pos += self.weapon_dir * speed
-            angle_deg = -math.degrees(math.atan2(self.weapon_dir[1], self.weapon_dir[0]))
-            
-            weapon_hitbox = (self.weapon_pos, (50, 16), angle_deg)
-            w_rect = pygame.Rect(self.weapon_pos[0]-25, self.weapon_pos[1]-8, 50, 16)
-
-            hit_wall = False
-            # Check against full polygon list for weapon accuracy
-            for poly in polygons:
-                prev_pos = self.weapon_pos - self.weapon_dir * speed
-                if physics.line_intersects_polygon(prev_pos, self.weapon_pos, poly):
-                    hit_wall = True
-                    break
-            
-            if hit_wall: 
-                self.weapon_pos -= self.weapon_dir * speed 
-                sword_half_length = 25
-                self.weapon_pos -= self.weapon_dir * sword_half_length
-                self.weapon_flying = False
-                hit_pos = self.weapon_pos + self.weapon_dir * (sword_half_length + 5)
-                sound_manager.play_collision()
-                for _ in range(5): particles.append(Particle(hit_pos[0], hit_pos[1], (255, 255, 0), 3))
-            elif not (0 < self.weapon_pos[0] < settings.GAME_WIDTH) or not (0 < self.weapon_pos[1] < settings.GAME_HEIGHT):
-                 self.weapon_flying = False
-                 self.weapon_pos[0] = np.clip(self.weapon_pos[0], 20, settings.GAME_WIDTH-20)
-                 self.weapon_pos[1] = np.clip(self.weapon_pos[1], 20, settings.GAME_HEIGHT-20)
-            else:
-                for e in enemies:
-                    if e.team_id != self.team_id and e.alive:
-                        hit, _, _ = physics.check_circle_rotated_rect(e.pos, e.radius, weapon_hitbox)
-                        if hit:
-                            e.hp -= self.throw_dmg
-                            self.damage_dealt += self.throw_dmg
-                            self.weapon_flying = False
-                            if e.hp <= 0:
-                                e.alive = False
-                                self.kills += 1
-                                try:
-                                    sound_manager.play_death()
-                                except Exception:
-                                    pass
-                                kill_feed.append(f"{self.name} SNIPED {e.name}")
-                            else:
-                                try:
-                                    sound_manager.play_collision()
-                                except Exception:
-                                    pass
-                            for _ in range(10):
-                                particles.append(Particle(e.pos[0], e.pos[1], (200, 0, 0), 5))
-                            break
-        
+
         if not self.has_weapon and not self.weapon_flying and self.weapon_pos is not None:
-            if np.linalg.norm(self.pos - self.weapon_pos) < 60: 
+            if np.linalg.norm(self.pos - self.weapon_pos) < 60:
+                log_event(events, "pickup", self.name, pos=self.weapon_pos)
                 self.has_weapon = True
                 self.weapon_pos = None
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""Structured match event log with a background writer.
+
+The simulation emits ("log", kind, actor, target, x, y, value) events next to
+its sound / particle / kill events; `Match` stamps them with the match seed
+and tick and hands each tick's batch to an `EventLogWriter`. The writer only
+enqueues: serialization and disk I/O happen on its own thread, so the tick
+never waits on the disk.
+
+Files are JSONL segments named <prefix>.<pid>.<seq>.jsonl. The first line of
+each segment is a header naming the fields; every other line is one record as
+a JSON array in that order:
+
+    {"fields": ["match", "tick", "kind", "actor", "target", "x", "y", "value"]}
+    [1234, 57, "throw", "Mario", "Bowser", 412.3, 880.1, 30]
+
+kind: throw, melee, ranged_hit, wall_hit, pickup, death, stuck, match_end
+"""
+import os
+import json
+import queue
+import threading
+from collections import namedtuple
+
+LogRecord = namedtuple("LogRecord", "match tick kind actor target x y value")
+
+DEFAULT_DIR = "logs"
+# A segment is closed and a new one started once it grows past this size
+MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+def log_event(events, kind, actor=None, target=None, pos=None, value=None):
+    """Append a log event to a tick's event list (positions rounded to 0.1px)."""
+    x, y = (round(float(pos[0]), 1), round(float(pos[1]), 1)) if pos is not None else (None, None)
+    events.append(("log", kind, actor, target, x, y, value))
+
+
+class EventLogWriter:
+    def __init__(self, directory=DEFAULT_DIR, prefix="events", max_segment_bytes=MAX_SEGMENT_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.records_written = 0
+        self._queue = queue.SimpleQueue()
+        self._segment = 0
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, records):
+        """Queue a batch of LogRecords; returns immediately."""
+        if records:
+            self._queue.put(records)
+
+    def close(self):
+        """Flush everything queued so far and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        self._segment += 1
+        path = os.path.join(self.directory, f"{self.prefix}.{os.getpid()}.{self._segment:04d}.jsonl")
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(json.dumps({"fields": list(LogRecord._fields)}) + "\n")
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            # Drain whatever else is already waiting so writes go out in big chunks
+            batches, done = [batch], batch is None
+            while not done:
+                try:
+                    batch = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batches.append(batch)
+                done = batch is None
+            lines = [json.dumps(list(r), separators=(",", ":")) for b in batches if b for r in b]
+            if lines:
+                if self._file is None or self._file.tell() > self.max_segment_bytes:
+                    self._open_segment()
+                self._file.write("\n".join(lines) + "\n")
+                self.records_written += len(lines)
+            if done:
+                break
+            if self._file is not None:
+                self._file.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
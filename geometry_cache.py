@@ -0,0 +1,62 @@
+"""On-disk cache for tables derived from a map's wall polygons.
+
+The distance field, nav grid and PVS table are pure functions of the polygons
+and a few build parameters, so each is stored under a name carrying a hash of
+exactly those:
+
+    cache/<name>.<digest>.npy     one array
+    cache/<name>.<digest>.npz     several named arrays
+
+Change a polygon, a build parameter or a format version (all part of `key`)
+and the file name changes with it, so stale tables are never loaded.
+"""
+import os
+import hashlib
+import json
+import numpy as np
+
+CACHE_DIR = "cache"
+
+
+def digest(polygons, key=()):
+    """12-hex-digit hash of `key` (versions, build parameters) and the polygons."""
+    blob = json.dumps([*key, [[list(pt) for pt in poly] for poly in polygons]])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:12]
+
+
+def cache_path(name, polygons, key=(), ext=".npy"):
+    return os.path.join(CACHE_DIR, f"{name}.{digest(polygons, key)}{ext}")
+
+
+def save(path, arrays):
+    """Write one array (.npy) or a dict of arrays (.npz) so readers never see a partial file."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Per-process temp name: tournament workers may build the same table at once
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        if isinstance(arrays, dict):
+            np.savez(f, **arrays)
+        else:
+            np.save(f, arrays)
+    os.replace(tmp, path)
+
+
+def load(path, mmap=False):
+    """The array or dict of arrays saved at `path`, or None if there is no file.
+    With `mmap`, a .npy is memory-mapped read-only so processes share its pages."""
+    if not os.path.exists(path):
+        return None
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def cached_array(path, build):
+    """Load `path`, or call `build()` and save what it returns there first."""
+    arrays = load(path)
+    if arrays is None:
+        arrays = build()
+        save(path, arrays)
+    return arrays
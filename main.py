@@ -1,6 +1,7 @@
 import pygame
 import math
 import os
+import time
 import numpy as np
 import settings
 import roster
@@ -8,8 +9,11 @@ import map_config
 import physics
 import assets_manager
 import sound_manager
-from entities import Gladiator, Particle
-from ui import draw_left_panel, draw_right_panel, draw_debug_panel
+from particles import ParticleSystem
+from match import Match, TICK_RATE
+from event_log import EventLogWriter
+import ui
+import profiler
 try:
     import tkinter as tk
     _tk_available = True
@@ -45,10 +49,59 @@ def to_screen(pos):
     screen_y = y * SCALE
     return (screen_x, screen_y)
 
-def get_bot_by_name(name):
-    for bot in roster.ALL_BOTS:
-        if bot.name == name: return bot
-    return roster.ALL_BOTS[0]
+# --- HELPER: Arena Layers ---
+def build_static_layer(background_img, show_debug_walls):
+    """Arena background (plus the wall outlines in debug mode), in arena-local pixels."""
+    layer = pygame.Surface((DISPLAY_GAME_WIDTH, DISPLAY_GAME_HEIGHT)).convert()
+    if background_img:
+        layer.blit(background_img, (0, 0))
+    else:
+        layer.fill(settings.FLOOR_COLOR)
+    if show_debug_walls:
+        for poly in map_config.POLYGONS:
+            pygame.draw.lines(layer, (0, 255, 0), True, [(x * SCALE, y * SCALE) for x, y in poly], 3)
+    return layer
+
+def settled_key(players):
+    """What the settled layer shows: which players are dust and which weapons lie still where."""
+    dead = tuple(i for i, p in enumerate(players) if not p.alive)
+    grounded = tuple((i, float(p.weapon_pos[0]), float(p.weapon_pos[1]), float(p.weapon_dir[0]), float(p.weapon_dir[1]))
+                     for i, p in enumerate(players)
+                     if p.alive and not p.has_weapon and not p.weapon_flying and p.weapon_pos is not None)
+    return dead, grounded
+
+def build_settled_layer(static_layer, players, dust_img, weapon_height):
+    """Static layer plus everything that has stopped moving: dust of the dead and grounded weapons."""
+    layer = static_layer.copy()
+    for p in players:
+        if not p.alive:
+            layer.blit(dust_img, dust_img.get_rect(center=(p.pos[0] * SCALE, p.pos[1] * SCALE)))
+        elif not p.has_weapon and not p.weapon_flying and p.weapon_pos is not None:
+            ground_angle = math.atan2(p.weapon_dir[1], p.weapon_dir[0])
+            w_rot = assets_manager.rotated_texture("weapon.png", -math.degrees(ground_angle) + 90, fixed_height=weapon_height)
+            layer.blit(w_rot, w_rot.get_rect(center=(p.weapon_pos[0] * SCALE, p.weapon_pos[1] * SCALE)))
+    return layer
+
+# --- HELPER: Render Interpolation ---
+def snapshot_state(players):
+    """Position, facing and weapon position of every player as of the current sim tick."""
+    return {p: (p.pos.copy(), p.angle, p.weapon_flying, None if p.weapon_pos is None else p.weapon_pos.copy())
+            for p in players}
+
+def interpolated(p, prev_state, alpha):
+    """(pos, angle, weapon_pos) of `p` drawn `alpha` of the way from the previous sim tick to the current one."""
+    prev = prev_state.get(p) if prev_state else None
+    if prev is None or alpha >= 1.0:
+        return p.pos, p.angle, p.weapon_pos
+    prev_pos, prev_angle, prev_flying, prev_weapon = prev
+    pos = prev_pos + (p.pos - prev_pos) * alpha
+    turn = (p.angle - prev_angle + math.pi) % (2 * math.pi) - math.pi
+    angle = prev_angle + turn * alpha
+    weapon_pos = p.weapon_pos
+    # Only a weapon that was already flying (or already lying still) moves smoothly; throws and pickups snap
+    if weapon_pos is not None and prev_weapon is not None and prev_flying == p.weapon_flying:
+        weapon_pos = prev_weapon + (weapon_pos - prev_weapon) * alpha
+    return pos, angle, weapon_pos
 
 def main():
     clock = pygame.time.Clock()
@@ -62,20 +115,25 @@ def main():
     font_win = pygame.font.SysFont("Arial", 64, bold=True)
     font_countdown = pygame.font.SysFont("Arial", 300, bold=True)
 
-    particles = []
-    kill_feed = [] 
+    # Fixed-size pool: hit effects recycle slots, so memory stays flat over a session
+    particles = ParticleSystem()
+    # Only the lines the panel shows are kept (see ui.KILL_FEED_LINES)
+    kill_feed = []
     
     # --- LOAD ASSETS (HIGH RES) ---
-    # We load assets multiplied by SCALE so they look crisp
-    player_size = int(70 * SCALE)
+    # We load assets multiplied by SCALE so they look crisp. Everything comes
+    # pre-scaled out of the memory-mapped asset pack (built on the first launch)
+    assets_manager.load_pack(SCALE)
+    player_size = int(settings.PLAYER_SPRITE_SIZE * SCALE)
     
-    weapon_sprite = assets_manager.load_texture("weapon.png", fixed_height=int(55 * SCALE))
+    # Sprites are drawn through assets_manager.rotated_texture, which caches every rotation
+    weapon_height = int(settings.WEAPON_SPRITE_HEIGHT * SCALE)
+    assets_manager.load_texture("weapon.png", fixed_height=weapon_height)
     
     # Load Map Background
     bg_path = os.path.join("assets", map_config.MAP_IMAGE_FILE)
     if os.path.exists(bg_path):
-        background_img = pygame.image.load(bg_path).convert()
-        background_img = pygame.transform.scale(background_img, (DISPLAY_GAME_WIDTH, DISPLAY_GAME_HEIGHT))
+        background_img = assets_manager.load_texture(map_config.MAP_IMAGE_FILE, size=(DISPLAY_GAME_WIDTH, DISPLAY_GAME_HEIGHT))
     else:
         background_img = None
 
@@ -87,34 +145,38 @@ def main():
     pygame.draw.circle(dust_img, (150, 150, 150, 180), (40, 35), 4)
 
     # --- SPAWN TEAMS ---
-    green_team = []
-    for i, name in enumerate(roster.TEAM_GREEN_NAMES):
-        stats = get_bot_by_name(name)
-        spawn_x = (settings.GAME_WIDTH / (len(roster.TEAM_GREEN_NAMES) + 1)) * (i+1)
-        green_team.append(Gladiator(spawn_x, 100, 0, stats))
-        # Update sprite to high res
-        green_team[-1].base_image = assets_manager.load_texture(stats.image_file, size=(player_size, player_size))
-        green_team[-1].angle = math.pi / 2
-    
-    red_team = []
-    for i, name in enumerate(roster.TEAM_RED_NAMES):
-        stats = get_bot_by_name(name)
-        spawn_x = (settings.GAME_WIDTH / (len(roster.TEAM_RED_NAMES) + 1)) * (i+1)
-        red_team.append(Gladiator(spawn_x, settings.GAME_HEIGHT - 100, 1, stats))
-        # Update sprite to high res
-        red_team[-1].base_image = assets_manager.load_texture(stats.image_file, size=(player_size, player_size))
-        red_team[-1].angle = -math.pi / 2
-    
-    all_players = green_team + red_team
+    event_log = EventLogWriter(settings.EVENT_LOG_DIR) if settings.EVENT_LOG_DIR else None
+    team_titles = [title for title, _, _ in roster.MATCH_TEAMS]
+    team_colors = [color for _, color, _ in roster.MATCH_TEAMS]
+    match = Match([names for _, _, names in roster.MATCH_TEAMS], event_log=event_log)
+    all_players = match.all_players
+    # Two teams keep the classic green health bars; a free-for-all shows team colors
+    hp_colors = [(0, 255, 0)] * 2 if len(match.teams) == 2 else team_colors
+    # One atlas for this match's sprites: portraits, weapon, dust and health-bar pieces
+    bar_w, bar_h = int(30 * SCALE), int(5 * SCALE)
+    atlas_pieces = {"dust": dust_img, "hp_bg": pygame.Surface((bar_w, bar_h), pygame.SRCALPHA)}
+    atlas_pieces["hp_bg"].fill((255, 0, 0))
+    for team_id, color in enumerate(hp_colors):
+        atlas_pieces[("hp_fill", team_id)] = pygame.Surface((bar_w, bar_h), pygame.SRCALPHA)
+        atlas_pieces[("hp_fill", team_id)].fill(color)
+    atlas = assets_manager.build_match_atlas({p.stats.image_file for p in all_players}, player_size, weapon_height, atlas_pieces)
+    dust_img = atlas["dust"]
+    for p in all_players:
+        # Attach high res sprites (the simulation itself never loads textures)
+        p.base_image = assets_manager.load_texture(p.stats.image_file, size=(player_size, player_size))
 
     # --- GAME VARIABLES ---
     show_debug_walls = False
+    speed_index = 0  # index into settings.SPEED_STEPS
+    # Fixed-timestep clock: real time accumulates and is spent in whole sim ticks
+    sim_dt = 1.0 / TICK_RATE
+    sim_accumulator = 0.0
+    last_frame_time = time.perf_counter()
+    prev_state = None  # snapshot from before the latest tick, for interpolation
     game_over = False
     winner_text = ""
     winner_color = settings.WHITE
     
-    walk_sound_timer = 0  # Global timer for constant footstep rate
-    
     game_state = "WAITING" 
     countdown_start_time = 0
     countdown_last_play = None
@@ -124,13 +186,38 @@ def main():
     clipboard_msg = None
     clipboard_msg_time = 0
     
-    # Surfaces for UI
-    left_ui_surface = pygame.Surface((SIDE_PANEL_WIDTH, MONITOR_H))
-    right_ui_surface = pygame.Surface((SIDE_PANEL_WIDTH, MONITOR_H))
+    # Retained-mode side panels: rows only redraw when a bot's shown stats change
+    left_panel, right_panel = ui.make_panels(SIDE_PANEL_WIDTH, MONITOR_H, list(zip(team_titles, team_colors, match.teams)),
+                                             kill_feed, font_title, font_text, font_small)
+
+    # Arena layers (see build_static_layer / build_settled_layer) and dirty-rect bookkeeping
+    arena_rect = pygame.Rect(SIDE_PANEL_WIDTH, 0, DISPLAY_GAME_WIDTH, DISPLAY_GAME_HEIGHT)
+    static_layer = None
+    static_layer_debug = False
+    settled_layer = None
+    settled_state = None
+    sprite_rects = []  # window areas covered by moving sprites last frame
+    full_redraw = True
+
+    # Static overlay for the waiting screen (banners come from ui.render_banner's cache)
+    waiting_overlay = pygame.Surface((DISPLAY_GAME_WIDTH, DISPLAY_GAME_HEIGHT), pygame.SRCALPHA)
+    waiting_overlay.fill((0, 0, 0, 100))
+    # Pre-render the countdown digits so the frame each one appears on doesn't stall
+    for digit, color in (("3", (255, 0, 0)), ("2", (255, 165, 0)), ("1", (255, 255, 0))):
+        ui.render_banner(font_countdown, digit, color, 5)
+
+    # Frame profiler overlay (see profiler.py); the table is re-rendered a few times a second
+    profiler_overlay = None
+    profiler_overlay_frame = -1
+    trace_path = None
 
     running = True
     while running:
         current_time = pygame.time.get_ticks()
+        prof = profiler.current
+        now = time.perf_counter()
+        frame_time = min(now - last_frame_time, settings.MAX_FRAME_TIME)
+        last_frame_time = now
 
         # --- EVENT LOOP (Checking for Spacebar) ---
         for event in pygame.event.get():
@@ -138,11 +225,23 @@ def main():
                 running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
+                    if event_log: event_log.close()
                     main(); return
                 if event.key == pygame.K_d:
                     show_debug_walls = not show_debug_walls
                 if event.key == pygame.K_ESCAPE:
                     running = False
+                if event.key == pygame.K_p:
+                    profiler.toggle()
+                    prof = None  # timing starts with the next frame
+                    profiler_overlay = None
+                if event.key == pygame.K_e and profiler.current:
+                    trace_path = profiler.current.export_chrome_trace()
+                    profiler_overlay_frame = -1
+                if event.key == pygame.K_t:
+                    speed_index = (speed_index + 1) % len(settings.SPEED_STEPS)
+                if pygame.K_1 <= event.key < pygame.K_1 + len(settings.SPEED_STEPS):
+                    speed_index = event.key - pygame.K_1
 
                 if event.key == pygame.K_SPACE:
                     if game_state == "WAITING":
@@ -166,6 +265,7 @@ def main():
                             countdown_audio_start = None
                             countdown_audio_length = None
                     elif game_state == "GAME_OVER":
+                        if event_log: event_log.close()
                         main() # Restart
                         return
             elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -206,100 +306,130 @@ def main():
 
         # --- GAME LOGIC ---
         if game_state == "PLAYING" and not game_over:
-            green_alive = sum(1 for p in green_team if p.alive)
-            red_alive = sum(1 for p in red_team if p.alive)
-            
-            if green_alive == 0:
+            # Spend the accumulated game time in fixed ticks (turbo scales it; max just runs to the budget)
+            sim_speed = settings.SPEED_STEPS[speed_index]
+            if sim_speed is not None:
+                sim_accumulator += frame_time * sim_speed
+            budget_end = time.perf_counter() + settings.TURBO_FRAME_BUDGET / settings.FPS
+            if prof: t = prof.now()
+            while not match.finished and (sim_speed is None or sim_accumulator >= sim_dt):
+                prev_state = snapshot_state(all_players)
+                for event in match.step():
+                    kind = event[0]
+                    if kind == "sound":
+                        # Queued, not played: the voice manager merges a frame's worth of identical hits
+                        sound_manager.request(event[1])
+                    elif kind == "particles":
+                        _, x, y, color, speed, count = event
+                        particles.emit(x, y, color, speed, count, rng=match.rng.cosmetic)
+                    elif kind == "kill":
+                        _, killer, verb, victim = event
+                        kill_feed.append(f"{killer} {verb} {victim}")
+                        del kill_feed[:-ui.KILL_FEED_LINES]
+                # Particles age in sim ticks, so turbo plays them out at the same pace as the fight
+                particles.update()
+                if sim_speed is not None:
+                    sim_accumulator -= sim_dt
+                if time.perf_counter() >= budget_end:
+                    # Can't keep up: drop the backlog instead of spiralling further behind
+                    sim_accumulator = min(sim_accumulator, sim_dt)
+                    break
+            if prof: prof.lap("sim", t)
+            sound_manager.flush()
+
+            if match.finished:
                 game_over = True
                 game_state = "GAME_OVER"
-                winner_text = f"{roster.TEAM_RED_TITLE} WINS!"
-                winner_color = (50, 255, 50)
-            elif red_alive == 0:
-                game_over = True
-                game_state = "GAME_OVER"
-                winner_text = f"{roster.TEAM_GREEN_TITLE} WINS!"
-                winner_color = (50, 255, 50)
-
-            for p in all_players:
-                enemies = [e for e in all_players if e.team_id != p.team_id]
-                # Pass polygons-only (map_config.POLYGONS)
-                p.logic(enemies, all_players, map_config.POLYGONS, particles, kill_feed)
-                p.update_weapon(map_config.POLYGONS, all_players, particles, kill_feed)
-            
-            # Handle walk sounds at game level - constant rate if any player is moving
-            any_player_moving = any(np.linalg.norm(p.vel) > 0.5 for p in all_players if p.alive)
-            if any_player_moving:
-                walk_sound_timer += 1
-                if walk_sound_timer > 10:  # Play every ~10 frames (constant rate)
-                    sound_manager.play_walk()
-                    walk_sound_timer = 0
-            else:
-                walk_sound_timer = 0
+                if match.winner is None:
+                    winner_text = "DRAW!"
+                else:
+                    winner_text = f"{team_titles[match.winner]} WINS!"
+                winner_color = (50, 255, 50) if len(match.teams) == 2 or match.winner is None else team_colors[match.winner]
 
-        # --- DRAWING (DIRECT TO WINDOW) ---
-        
-        # 1. Background
-        if background_img:
-            window.blit(background_img, (SIDE_PANEL_WIDTH, 0))
+        # --- DRAWING (LAYERED) ---
+        # How far between the last two sim ticks this frame falls
+        if game_state == "PLAYING" and settings.SPEED_STEPS[speed_index] is not None:
+            alpha = min(sim_accumulator / sim_dt, 1.0)
         else:
-            game_rect = pygame.Rect(SIDE_PANEL_WIDTH, 0, DISPLAY_GAME_WIDTH, DISPLAY_GAME_HEIGHT)
-            pygame.draw.rect(window, settings.FLOOR_COLOR, game_rect)
-
-        # 2. Dead Players (Dust)
-        for p in all_players:
-            if not p.alive: 
-                screen_pos = to_screen(p.pos)
-                rect = dust_img.get_rect(center=screen_pos)
-                window.blit(dust_img, rect)
-
-        # 3. Living Players
+            alpha = 1.0
+
+        if prof: t = prof.now()
+
+        # 1. Static layer (background + wall outlines), rebuilt only when debug is toggled
+        if static_layer is None or static_layer_debug != show_debug_walls:
+            static_layer = build_static_layer(background_img, show_debug_walls)
+            static_layer_debug = show_debug_walls
+            settled_state = None
+
+        # 2. Settled layer (dust + grounded weapons), rebuilt only when one appears or goes away
+        state = settled_key(all_players)
+        if state != settled_state:
+            settled_layer = build_settled_layer(static_layer, all_players, dust_img, weapon_height)
+            settled_state = state
+            full_redraw = True
+
+        # Overlays, banners and debug drawing aren't tracked per rect: those frames redraw everything
+        overlay_frame = game_state != "PLAYING" or show_debug_walls
+        full_redraw = full_redraw or overlay_frame
+
+        window.set_clip(arena_rect)
+        if full_redraw:
+            window.blit(settled_layer, arena_rect)
+            dirty_rects = []
+        else:
+            # Erase last frame's sprites by restoring the settled layer underneath them
+            for r in sprite_rects:
+                window.blit(settled_layer, r, r.move(-SIDE_PANEL_WIDTH, 0))
+            dirty_rects = sprite_rects
+        sprite_rects = []
+
+        # 3. Living Players, collected into one Surface.blits call
+        batch = []
         for p in all_players:
             if p.alive:
-                img = pygame.transform.rotate(p.base_image, -math.degrees(p.angle) + 90)
-                screen_pos = to_screen(p.pos)
-                rect = img.get_rect(center=screen_pos)
-                window.blit(img, rect)
-                
-                # Health Bar
-                bar_w = 30 * SCALE
-                bar_h = 5 * SCALE
-                bar_x = screen_pos[0] - (bar_w / 2)
-                bar_y = screen_pos[1] - (player_size / 2) - bar_h - 5
+                draw_pos, draw_angle, draw_weapon_pos = interpolated(p, prev_state, alpha)
+                img = assets_manager.rotated_texture(p.stats.image_file, -math.degrees(draw_angle) + 90, size=(player_size, player_size))
+                screen_pos = to_screen(draw_pos)
+                batch.append((img, img.get_rect(center=screen_pos)))
                 
+                # Health Bar: red background piece, team fill piece cropped to the HP fraction
+                bar_pos = (int(screen_pos[0] - bar_w / 2), int(screen_pos[1] - player_size / 2 - bar_h - 5))
                 pct = max(0, p.hp / p.max_hp)
-                pygame.draw.rect(window, (255, 0, 0), (bar_x, bar_y, bar_w, bar_h))
-                pygame.draw.rect(window, (0, 255, 0), (bar_x, bar_y, bar_w * pct, bar_h))
+                batch.append((atlas["hp_bg"], bar_pos))
+                batch.append((atlas[("hp_fill", p.team_id)], bar_pos, (0, 0, int(bar_w * pct), bar_h)))
 
                 # Weapon
                 if p.has_weapon:
-                    base_angle = -math.degrees(p.angle) + 90 
+                    base_angle = -math.degrees(draw_angle) + 90 
                     render_angle = base_angle + ((p.swing_timer * 8) - 60) if p.swing_timer > 0 else base_angle - 90
-                    w_rot = pygame.transform.rotate(weapon_sprite, render_angle)
+                    w_rot = assets_manager.rotated_texture("weapon.png", render_angle, fixed_height=weapon_height)
                     
-                    forward_vec = np.array([math.cos(p.angle), math.sin(p.angle)])
+                    forward_vec = np.array([math.cos(draw_angle), math.sin(draw_angle)])
                     hand_offset = forward_vec * (20 * SCALE)
                     hand_pos = (screen_pos[0] + hand_offset[0], screen_pos[1] + hand_offset[1])
                     
-                    rect = w_rot.get_rect(center=hand_pos)
-                    window.blit(w_rot, rect)
+                    batch.append((w_rot, w_rot.get_rect(center=hand_pos)))
                 elif p.weapon_flying:
-                    w_rot = pygame.transform.rotate(weapon_sprite, -math.degrees(math.atan2(p.weapon_dir[1], p.weapon_dir[0])) + 90)
-                    screen_w_pos = to_screen(p.weapon_pos)
-                    rect = w_rot.get_rect(center=screen_w_pos)
-                    window.blit(w_rot, rect)
-                elif p.weapon_pos is not None:
-                    ground_angle = math.atan2(p.weapon_dir[1], p.weapon_dir[0])
-                    w_rot = pygame.transform.rotate(weapon_sprite, -math.degrees(ground_angle) + 90)
-                    screen_w_pos = to_screen(p.weapon_pos)
-                    rect = w_rot.get_rect(center=screen_w_pos)
-                    window.blit(w_rot, rect)
+                    w_rot = assets_manager.rotated_texture("weapon.png", -math.degrees(math.atan2(p.weapon_dir[1], p.weapon_dir[0])) + 90, fixed_height=weapon_height)
+                    screen_w_pos = to_screen(draw_weapon_pos)
+                    batch.append((w_rot, w_rot.get_rect(center=screen_w_pos)))
+                # (weapons lying on the ground live in the settled layer)
+        sprite_rects.extend(window.blits(batch, doreturn=True))
+
+        # Hit particles, one batched blit
+        sprite_rects.extend(particles.draw(window, (SIDE_PANEL_WIDTH, 0), SCALE))
+
+        # Turbo tag in the arena's top-right corner (the profiler overlay owns the top-left),
+        # tracked like a sprite so it gets erased when it changes
+        if game_state == "PLAYING" and settings.SPEED_STEPS[speed_index] != 1:
+            ticks_per_frame = settings.SPEED_STEPS[speed_index]
+            label = "MAX" if ticks_per_frame is None else f"{ticks_per_frame}x"
+            text = ui.render_text(font_text, f">> {label}", (255, 255, 255))
+            tag_x = SIDE_PANEL_WIDTH + DISPLAY_GAME_WIDTH - text.get_width() - 10
+            sprite_rects.append(window.blit(text, (tag_x, 10)))
+        window.set_clip(None)
         
         if show_debug_walls:
-            # 4. Polygons
-            for poly in map_config.POLYGONS:
-                screen_poly = [to_screen(p) for p in poly]
-                pygame.draw.lines(window, (0, 255, 0), True, screen_poly, 3)
-
             # --- NEW: 5. PLAYER & WEAPON HITBOXES ---
             for p in all_players:
                 if not p.alive: continue
@@ -389,23 +519,30 @@ def main():
                 pass
 
 
+        if prof: t = prof.lap("arena", t)
+
         # 4. Draw UI
-        draw_left_panel(left_ui_surface, green_team, font_title, font_text, font_small)
-        # Draw debug info on left panel (per-player stuck/escape state)
-        # draw_debug_panel(left_ui_surface, all_players, font_text)
-        draw_right_panel(right_ui_surface, red_team, kill_feed, font_title, font_text, font_small)
+        left_panel.update()
+        right_panel.update()
         
-        window.blit(left_ui_surface, (0, 0))
-        window.blit(right_ui_surface, (SIDE_PANEL_WIDTH + DISPLAY_GAME_WIDTH, 0))
+        right_x = SIDE_PANEL_WIDTH + DISPLAY_GAME_WIDTH
+        if full_redraw:
+            window.blit(left_panel.surface, (0, 0))
+            window.blit(right_panel.surface, (right_x, 0))
+        else:
+            for r in left_panel.dirty_rects:
+                dirty_rects.append(window.blit(left_panel.surface, r, r))
+            for r in right_panel.dirty_rects:
+                dirty_rects.append(window.blit(right_panel.surface, r.move(right_x, 0), r))
         
+        if prof: t = prof.lap("panels", t)
+
         # 5. Overlays
         cx, cy = MONITOR_W // 2, MONITOR_H // 2
         
         if game_state == "WAITING":
-            overlay = pygame.Surface((DISPLAY_GAME_WIDTH, DISPLAY_GAME_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 100))
-            window.blit(overlay, (SIDE_PANEL_WIDTH, 0))
-            text = font_win.render("PRESS SPACE TO START", True, (255, 255, 255))
+            window.blit(waiting_overlay, (SIDE_PANEL_WIDTH, 0))
+            text = ui.render_text(font_win, "PRESS SPACE TO START", (255, 255, 255))
             window.blit(text, (cx - text.get_width()//2, cy - text.get_height()//2))
 
         elif game_state == "COUNTDOWN":
@@ -496,19 +633,36 @@ def main():
                     sound_manager.play_countdown(count_val)
                     countdown_last_play = count_val
 
-            text = font_countdown.render(count_text, True, color)
-            outline = font_countdown.render(count_text, True, (0,0,0))
-            window.blit(outline, (cx - text.get_width()//2 + 5, cy - text.get_height()//2 + 5))
-            window.blit(text, (cx - text.get_width()//2, cy - text.get_height()//2))
+            banner = ui.render_banner(font_countdown, count_text, color, 5)
+            window.blit(banner, (cx - (banner.get_width() - 5)//2, cy - (banner.get_height() - 5)//2))
 
         elif game_state == "GAME_OVER":
-            text = font_win.render(winner_text, True, winner_color)
-            outline = font_win.render(winner_text, True, (0, 0, 0))
-            window.blit(outline, (cx - text.get_width()//2 + 4, cy - text.get_height()//2 + 4))
-            window.blit(text, (cx - text.get_width()//2, cy - text.get_height()//2))
-
-        pygame.display.flip()
+            banner = ui.render_banner(font_win, winner_text, winner_color, 4)
+            window.blit(banner, (cx - (banner.get_width() - 4)//2, cy - (banner.get_height() - 4)//2))
+
+        if prof:
+            if prof.frames - profiler_overlay_frame >= 15 or profiler_overlay is None:
+                footer = f"trace: {trace_path}" if trace_path else None
+                profiler_overlay = ui.render_profiler_overlay(prof.percentiles(), len(prof.totals.get("frame", ())), font_small, footer)
+                profiler_overlay_frame = prof.frames
+            # Drawn over the arena and tracked like a sprite, so the next frame restores what's under it
+            window.set_clip(arena_rect)
+            sprite_rects.append(window.blit(profiler_overlay, (SIDE_PANEL_WIDTH + 10, 10)))
+            window.set_clip(None)
+            t = prof.now()
+
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            # Push only what moved: last frame's sprite areas, this frame's, and changed panel rows
+            pygame.display.update(dirty_rects + sprite_rects)
+        # A frame that drew untracked overlays must be fully wiped by the next one
+        full_redraw = overlay_frame
+        if prof:
+            prof.lap("flip", t)
+            prof.end_frame()
         clock.tick(settings.FPS)
+    if event_log: event_log.close()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,285 @@
+"""Headless match engine.
+
+A `Match` owns the gladiators of one fight and steps the simulation without
+touching the display or the mixer, so it runs as fast as the CPU allows.
+Anything the renderer cares about comes back from `step()` as plain tuples:
+
+    ("sound", name)                              name: swing/throw/collision/death/walk
+    ("particles", x, y, color, speed, count)     a burst of hit particles
+    ("kill", killer_name, verb, victim_name)     one line of the kill feed
+
+Gladiators also emit ("log", ...) events; `step()` strips those, stamps them
+with the seed and tick and passes them to the `event_log` writer if one was
+given (see event_log.py).
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import math
+import numpy as np
+import settings
+import roster
+import map_config
+import physics
+import pvs
+import sdf
+import nav
+import profiler
+import vision
+from entities import Gladiator, is_point_free, SIGHT_RANGE
+from rng import MatchRandom
+from spatial import SpatialHash
+from projectiles import Projectiles
+from event_log import LogRecord
+
+# Bump whenever a change can alter simulated outcomes; it is part of the result
+# cache key (see result_cache.py), so old cached results are ignored after a bump
+ENGINE_VERSION = 11
+
+# Sim ticks per second of game time (see settings.SIM_HZ). Speeds, cooldowns and
+# timers are counted in settings.BASE_SIM_HZ ticks and scaled by settings.TICK_SCALE
+TICK_RATE = settings.SIM_HZ
+
+# Hard cap so a stalemate can't spin forever (5 minutes of game time)
+MAX_TICKS = TICK_RATE * 60 * 5
+
+# Wall resolution passes per tick; each pass only re-checks the bots the last one pushed
+WALL_PASSES = 4
+
+# Reference ticks between footstep sounds while anyone is moving
+WALK_SOUND_INTERVAL = 10
+
+# Free-for-all spawns: distance of the spawn ellipse from the arena edge, and
+# the gap between teammates along it
+SPAWN_MARGIN = 100
+SPAWN_SPACING = 60
+
+
+def free_spot(x, y, geometry, taken=(), radius=25):
+    """(x, y) itself if a body fits there, else the nearest free point on rings
+    around it. Spots in `taken` count as occupied by another body."""
+    def fits(pt):
+        return (is_point_free(pt, geometry, radius) and
+                all(math.dist(pt, other) >= radius * 2 for other in taken))
+
+    if geometry is None or fits((x, y)):
+        return x, y
+    for ring in range(1, 11):
+        r = ring * 20
+        for k in range(8 * ring):
+            a = 2 * math.pi * k / (8 * ring)
+            pt = (x + r * math.cos(a), y + r * math.sin(a))
+            if fits(pt):
+                return pt
+    return x, y
+
+
+def spawn_layout(team_sizes, geometry=None):
+    """[[(x, y, facing), ...] per team] of spawn points.
+
+    Two teams line up along the top and bottom walls (team 0 on top, facing
+    down). With more, each team gets its own arc of an ellipse inside the
+    arena, teammates side by side, everyone facing the middle."""
+    width, height = settings.GAME_WIDTH, settings.GAME_HEIGHT
+    if len(team_sizes) == 2:
+        rows = [(100, math.pi / 2), (height - 100, -math.pi / 2)]
+        return [[((width / (n + 1)) * (i + 1), y, facing) for i in range(n)]
+                for n, (y, facing) in zip(team_sizes, rows)]
+
+    cx, cy = width / 2, height / 2
+    rx, ry = cx - SPAWN_MARGIN, cy - SPAWN_MARGIN
+    step = SPAWN_SPACING / ((rx + ry) / 2)
+    layout = []
+    taken = []
+    for team_id, n in enumerate(team_sizes):
+        center = -math.pi / 2 + 2 * math.pi * team_id / len(team_sizes)
+        spots = []
+        for i in range(n):
+            a = center + (i - (n - 1) / 2) * step
+            x, y = free_spot(cx + rx * math.cos(a), cy + ry * math.sin(a), geometry, taken)
+            taken.append((x, y))
+            spots.append((x, y, math.atan2(cy - y, cx - x)))
+        layout.append(spots)
+    return layout
+
+
+class Match:
+    def __init__(self, teams=None, polygons=None, max_ticks=MAX_TICKS, seed=None, event_log=None,
+                 batch_sight=False):
+        if teams is None:
+            teams = [roster.TEAM_GREEN_NAMES, roster.TEAM_RED_NAMES]
+        if len(teams) < 2:
+            raise ValueError(f"Match needs at least 2 teams, got {len(teams)}")
+
+        self.polygons = map_config.POLYGONS if polygons is None else polygons
+        # Wall edges bucketed by cell; built once per map and shared by every match
+        self.geometry = physics.get_edge_grid(self.polygons)
+        # Precomputed cell-to-cell visibility, if `python pvs.py --build` has been run for this map
+        self.geometry.pvs = pvs.load(self.polygons)
+        # Batch each team's line-of-sight checks once per tick (see _batch_sight). Off
+        # by default: at 4v4 the per-bot scans, which stop at the nearest visible enemy
+        # and mostly hit the PVS table, are cheaper (benchmark scenario "4v4-batched")
+        self.batch_sight = batch_sight
+        # Signed distance field for free-space tests; built and cached on first use
+        self.geometry.sdf = sdf.load_or_build(self.polygons)
+        # All-pairs next-hop table for steering; built and cached on first use
+        self.geometry.nav = nav.load_or_build(self.polygons)
+        self.max_ticks = max_ticks
+        # Same seed + same lineups + same map => same fight, tick for tick
+        self.rng = MatchRandom(seed)
+        self.seed = self.rng.seed
+        # Optional event_log.EventLogWriter; receives one batch of LogRecords per tick
+        self.event_log = event_log
+
+        # --- SPAWN TEAMS ---
+        layout = spawn_layout([len(names) for names in teams], self.geometry)
+        self.teams = []
+        for team_id, (names, spots) in enumerate(zip(teams, layout)):
+            team = []
+            for name, (spawn_x, spawn_y, facing) in zip(names, spots):
+                p = Gladiator(spawn_x, spawn_y, team_id, roster.get_bot_by_name(name), rng=self.rng)
+                p.angle = facing
+                team.append(p)
+            self.teams.append(team)
+
+        self.all_players = [p for team in self.teams for p in team]
+        # Living players overall, per team and per team's enemies. Built once and
+        # only pruned on ticks where someone dies (see _remove_dead)
+        self.alive_players = list(self.all_players)
+        self.alive_by_team = [list(team) for team in self.teams]
+        self.enemies = [[e for e in self.all_players if e.team_id != team_id]
+                        for team_id in range(len(self.teams))]
+
+        # Rebuilt every tick; used for body collisions and nearest-enemy search
+        self.grid = SpatialHash()
+        # Every weapon in flight; stepped once per tick after all the bots have moved
+        self.projectiles = Projectiles()
+
+        self.tick = 0
+        self.walk_sound_timer = 0
+        self.finished = False
+        self.winner = None  # team id of the winner, None for a draw / timeout
+
+    def step(self):
+        """Advance the match by one tick and return the events it produced."""
+        events = []
+        if self.finished:
+            return events
+
+        prof = profiler.current
+        alive = self.alive_players
+        self.grid.rebuild(alive)
+        sight = {}
+        if self.batch_sight:
+            if prof: t = prof.now()
+            sight = self._batch_sight()
+            if prof: prof.lap("sight", t)
+        for p in alive:
+            p.logic(self.enemies[p.team_id], alive, self.geometry, events, grid=self.grid, sight=sight.get(p))
+            if p.weapon_flying and p not in self.projectiles:
+                self.projectiles.launch(p, self.geometry)
+        if prof: t = prof.now()
+        self._resolve_walls(alive)
+        if prof: t = prof.lap("walls", t)
+        self.projectiles.step(alive, events)
+        for p in alive:
+            p.update_weapon(events)
+        if prof: prof.lap("weapon", t)
+        if any(e[0] == "kill" for e in events):
+            self._remove_dead()
+
+        # Footsteps play at a constant rate while any living player is moving
+        if any(np.linalg.norm(p.vel) > 0.5 for p in self.alive_players):
+            self.walk_sound_timer += settings.TICK_SCALE
+            if self.walk_sound_timer > WALK_SOUND_INTERVAL:
+                events.append(("sound", "walk"))
+                self.walk_sound_timer = 0
+        else:
+            self.walk_sound_timer = 0
+
+        tick = self.tick
+        self.tick += 1
+        self._check_finished()
+
+        # Split the structured log records off; the renderer only wants the rest.
+        # Events carry the tick that produced them; match_end the final tick count
+        if self.event_log is not None:
+            records = [LogRecord(self.seed, tick, *e[1:]) for e in events if e[0] == "log"]
+            if self.finished:
+                records.append(LogRecord(self.seed, self.tick, "match_end", None, None, None, None, self.winner))
+            self.event_log.write(records)
+        return [e for e in events if e[0] != "log"]
+
+    def _batch_sight(self):
+        """Line of sight for every bot whose target scan is due this tick (its
+        scan_timer runs out in logic()) to each living enemy in SIGHT_RANGE,
+        worked out in one vision.lines_of_sight call per team.
+        Returns {bot: {enemy: visible}}."""
+        sight = {}
+        for team_id, team in enumerate(self.alive_by_team):
+            due = [p for p in team if p.scan_timer <= settings.TICK_SCALE]
+            enemies = [e for e in self.enemies[team_id] if e.alive]
+            if not due or not enemies:
+                continue
+            due_pos = np.array([p.pos for p in due])
+            enemy_pos = np.array([e.pos for e in enemies])
+            near = np.linalg.norm(due_pos[:, None, :] - enemy_pos[None, :, :], axis=2) < SIGHT_RANGE
+            ii, jj = np.nonzero(near)
+            visible = vision.lines_of_sight(due_pos[ii], enemy_pos[jj], self.geometry)
+            for i, j, v in zip(ii, jj, visible):
+                sight.setdefault(due[i], {})[enemies[j]] = bool(v)
+        return sight
+
+    def _resolve_walls(self, players):
+        """Push every living player out of the walls and cancel their velocity
+        into them (see EdgeGrid.resolve_all)."""
+        movers = [p for p in players if p.alive]
+        if not movers:
+            return
+        pos = np.array([p.pos for p in movers])
+        vel = np.array([p.vel for p in movers])
+        moved = self.geometry.resolve_all(pos, vel, [p.radius for p in movers], passes=WALL_PASSES,
+                                          bounds=(settings.GAME_WIDTH, settings.GAME_HEIGHT))
+        for i in np.flatnonzero(moved):
+            movers[i].pos[:] = pos[i]
+            movers[i].vel[:] = vel[i]
+
+    def _remove_dead(self):
+        """Drop this tick's casualties from the living rosters and enemy lists."""
+        self.alive_players = [p for p in self.alive_players if p.alive]
+        for team_id, team in enumerate(self.alive_by_team):
+            self.alive_by_team[team_id] = [p for p in team if p.alive]
+            self.enemies[team_id] = [e for e in self.enemies[team_id] if e.alive]
+
+    def _check_finished(self):
+        teams_alive = [team_id for team_id, team in enumerate(self.alive_by_team) if team]
+        if len(teams_alive) <= 1:
+            self.finished = True
+            self.winner = teams_alive[0] if teams_alive else None
+        elif self.tick >= self.max_ticks:
+            self.finished = True
+            self.winner = None
+
+    def run_to_completion(self):
+        """Step until one team is left (or the tick cap is hit) and return the result."""
+        while not self.finished:
+            self.step()
+        return self.result()
+
+    def result(self):
+        return {
+            "winner": self.winner,
+            "seed": self.seed,
+            "ticks": self.tick,
+            "players": [
+                {
+                    "name": p.name,
+                    "team_id": p.team_id,
+                    "alive": p.alive,
+                    "hp": p.hp,
+                    "kills": p.kills,
+                    "damage_dealt": p.damage_dealt,
+                }
+                for p in self.all_players
+            ],
+        }
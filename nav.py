@@ -0,0 +1,152 @@
+"""Navigation grid with a precomputed all-pairs next-hop table.
+
+The arena is cut into CELL_SIZE cells. A cell is walkable when its center has
+at least CLEARANCE pixels to the nearest wall (read off the map's distance
+field). For every walkable goal cell and every cell of the map the table
+stores which of the 8 neighbours to step into next along a shortest path, so
+steering toward any point is one lookup:
+
+    direction = grid.direction(pos, goal)    # unit vector, or None if unreachable
+
+Diagonal steps are only allowed when both orthogonal cells they cut past are
+walkable. Goals in a blocked cell are snapped to the nearest walkable cell.
+The table (~3 MB of int8) is built once per map in a few seconds and cached
+under cache/, keyed by a hash of the polygons.
+"""
+import math
+import numpy as np
+import settings
+import map_config
+import sdf
+import geometry_cache
+
+NAV_VERSION = 1
+CELL_SIZE = 25
+CLEARANCE = 25
+# Neighbour offsets (dx, dy); the table stores an index into this list
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+STEP_COST = tuple(math.hypot(dx, dy) for dx, dy in STEPS)
+# Goal rows relaxed per NumPy pass while building
+BUILD_CHUNK = 256
+
+
+class NavGrid:
+    def __init__(self, next_hop, walkable, snap, cell_size=CELL_SIZE):
+        self.next_hop = next_hop  # (cells, cells) int8: next_hop[goal, cell] -> STEPS index, -1 if none
+        self.walkable = walkable  # (cells,) bool
+        self.snap = snap          # (cells,) nearest walkable cell for every cell
+        self.cell_size = cell_size
+        self.cols = int(np.ceil(settings.GAME_WIDTH / cell_size))
+        self.rows = int(np.ceil(settings.GAME_HEIGHT / cell_size))
+        self.walkable_cells = np.flatnonzero(walkable)
+        self._snap = snap.tolist()
+
+    def cell_of(self, pos):
+        cx = min(max(int(pos[0] // self.cell_size), 0), self.cols - 1)
+        cy = min(max(int(pos[1] // self.cell_size), 0), self.rows - 1)
+        return cy * self.cols + cx
+
+    def center(self, cell):
+        return np.array([(cell % self.cols + 0.5) * self.cell_size, (cell // self.cols + 0.5) * self.cell_size])
+
+    def direction(self, pos, goal):
+        """Unit vector to steer along from `pos` toward `goal`.
+
+        Once `pos` is in the goal's cell it points straight at `goal`; None means
+        the goal can't be reached through walkable cells."""
+        start, target = self.cell_of(pos), self._snap[self.cell_of(goal)]
+        if start == target:
+            wx, wy = goal[0], goal[1]
+        else:
+            hop = self.next_hop[target, start]
+            if hop < 0:
+                return None
+            dx, dy = STEPS[hop]
+            wx = (start % self.cols + dx + 0.5) * self.cell_size
+            wy = (start // self.cols + dy + 0.5) * self.cell_size
+        vx, vy = wx - pos[0], wy - pos[1]
+        dist = math.hypot(vx, vy)
+        if dist < 1e-6:
+            return None
+        return np.array([vx / dist, vy / dist])
+
+    def random_point(self, rng):
+        """Center of a uniformly chosen walkable cell (`rng` is a random.Random stream)."""
+        return self.center(int(self.walkable_cells[rng.randrange(len(self.walkable_cells))]))
+
+
+def _shifted(grid, dx, dy, fill):
+    """out[..., y, x] = grid[..., y + dy, x + dx], `fill` where that falls off the map."""
+    out = np.full_like(grid, fill)
+    rows, cols = grid.shape[-2:]
+    ys, yd = slice(max(dy, 0), rows + min(dy, 0)), slice(max(-dy, 0), rows + min(-dy, 0))
+    xs, xd = slice(max(dx, 0), cols + min(dx, 0)), slice(max(-dx, 0), cols + min(-dx, 0))
+    out[..., yd, xd] = grid[..., ys, xs]
+    return out
+
+
+def build(polygons, cell_size=CELL_SIZE, clearance=CLEARANCE):
+    """Return (next_hop, walkable, snap) arrays for `polygons`."""
+    field = sdf.load_or_build(polygons)
+    cols = int(np.ceil(settings.GAME_WIDTH / cell_size))
+    rows = int(np.ceil(settings.GAME_HEIGHT / cell_size))
+    n = rows * cols
+    xs, ys = np.meshgrid((np.arange(cols) + 0.5) * cell_size, (np.arange(rows) + 0.5) * cell_size)
+    centers = np.stack([xs.ravel(), ys.ravel()], axis=1)
+    walkable = field.distances(centers) >= clearance
+    walkable &= ((centers[:, 0] > clearance) & (centers[:, 0] < settings.GAME_WIDTH - clearance) &
+                 (centers[:, 1] > clearance) & (centers[:, 1] < settings.GAME_HEIGHT - clearance))
+    open_grid = walkable.reshape(rows, cols)
+
+    # A step is legal if it lands on a walkable cell and (for diagonals) cuts no corner
+    legal = []
+    for dx, dy in STEPS:
+        ok = _shifted(open_grid, dx, dy, False)
+        if dx and dy:
+            ok &= _shifted(open_grid, dx, 0, False) & _shifted(open_grid, 0, dy, False)
+        legal.append(ok)
+
+    goals = np.flatnonzero(walkable)
+    next_hop = np.full((n, n), -1, dtype=np.int8)
+    for lo in range(0, len(goals), BUILD_CHUNK):
+        chunk = goals[lo:lo + BUILD_CHUNK]
+        dist = np.full((len(chunk), rows, cols), np.inf, dtype=np.float32)
+        dist.reshape(len(chunk), n)[np.arange(len(chunk)), chunk] = 0.0
+        # Bellman-Ford style relaxation over the whole grid until nothing improves
+        while True:
+            best = dist
+            for (dx, dy), cost, ok in zip(STEPS, STEP_COST, legal):
+                via = np.where(ok, _shifted(dist, dx, dy, np.inf) + np.float32(cost), np.inf)
+                best = np.minimum(best, via)
+            if np.array_equal(best, dist):
+                break
+            dist = best
+        options = np.stack([np.where(ok, _shifted(dist, dx, dy, np.inf) + np.float32(cost), np.inf)
+                            for (dx, dy), cost, ok in zip(STEPS, STEP_COST, legal)])
+        hop = options.argmin(axis=0).astype(np.int8)
+        hop[~np.isfinite(options.min(axis=0))] = -1
+        next_hop[chunk] = hop.reshape(len(chunk), n)
+
+    # Nearest walkable cell (by center distance) for goals that sit in a blocked cell
+    open_centers = centers[goals]
+    snap = np.empty(n, dtype=np.int32)
+    for lo in range(0, n, BUILD_CHUNK):
+        d = np.linalg.norm(centers[lo:lo + BUILD_CHUNK, None, :] - open_centers[None], axis=2)
+        snap[lo:lo + BUILD_CHUNK] = goals[d.argmin(axis=1)]
+    return next_hop, walkable, snap
+
+
+_LOADED = {}
+
+def load_or_build(polygons=None, cell_size=CELL_SIZE, clearance=CLEARANCE):
+    """Return the map's NavGrid, loading it from cache/ or building and saving it."""
+    polygons = map_config.POLYGONS if polygons is None else polygons
+    key = (NAV_VERSION, sdf.SDF_VERSION, cell_size, clearance)
+    path = geometry_cache.cache_path("nav", polygons, key, ext=".npz")
+    if path not in _LOADED:
+        def build_arrays():
+            next_hop, walkable, snap = build(polygons, cell_size, clearance)
+            return {"next_hop": next_hop, "walkable": walkable, "snap": snap}
+        arrays = geometry_cache.cached_array(path, build_arrays)
+        _LOADED[path] = NavGrid(arrays["next_hop"], arrays["walkable"], arrays["snap"], cell_size=cell_size)
+    return _LOADED[path]
@@ -0,0 +1,93 @@
+"""Pooled particle system for hit effects.
+
+Every particle lives in a slot of fixed-size NumPy arrays, so a session
+never allocates more than `capacity` particles: new bursts reuse dead slots
+and, when the pool is full, overwrite the particles closest to fading out.
+`update` advances all of them in a handful of array operations and `draw`
+blits pre-rendered circle sprites (one per color / radius / alpha step) in a
+single `Surface.blits` call.
+"""
+import random
+import numpy as np
+import pygame
+import settings
+
+# Alpha is quantized to this many steps when picking a pre-rendered sprite
+ALPHA_STEPS = 16
+
+
+class ParticleSystem:
+    def __init__(self, capacity=settings.PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.life = np.zeros(capacity)
+        self.decay = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self._sprites = {}
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def emit(self, x, y, color, speed, count, size=5, rng=random):
+        """Spawn `count` particles flying out of (x, y) in random directions.
+
+        Angles and decay rates are drawn from `rng` (a random.Random stream)
+        the same way the old per-object Particle did."""
+        count = min(count, self.capacity)
+        free = np.flatnonzero(~self.alive)
+        if len(free) < count:
+            # Pool is full: recycle the particles that would have faded out first
+            fading = np.argsort(np.where(self.alive, self.life, -1.0))
+            free = fading[:count]
+        slots = free[:count]
+
+        angles = np.array([rng.uniform(0, 6.28) for _ in range(count)])
+        self.decay[slots] = [0.05 + rng.uniform(0, 0.05) for _ in range(count)]
+        self.pos[slots] = (x, y)
+        self.vel[slots, 0] = np.cos(angles) * speed
+        self.vel[slots, 1] = np.sin(angles) * speed
+        self.life[slots] = 1.0
+        self.size[slots] = size
+        self.color[slots] = color
+        self.alive[slots] = True
+
+    def update(self):
+        """Advance every live particle by one sim tick."""
+        live = self.alive
+        # Velocity, decay and shrink are per reference tick (see settings.TICK_SCALE)
+        dt = settings.TICK_SCALE
+        self.pos[live] += self.vel[live] * dt
+        self.life[live] -= self.decay[live] * dt
+        self.size[live] *= 0.9 ** dt
+        self.alive &= (self.life > 0) & (self.size >= 0.5)
+
+    def clear(self):
+        self.alive[:] = False
+
+    def _sprite(self, color, radius, alpha_step):
+        key = (color, radius, alpha_step)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            alpha = int(255 * alpha_step / ALPHA_STEPS)
+            sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius)
+            self._sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface, offset=(0, 0), scale=1.0):
+        """Blit every live particle; positions are game coordinates mapped by
+        `offset + pos * scale`. Returns the list of rects that were touched."""
+        idx = np.flatnonzero(self.alive)
+        if not len(idx):
+            return []
+        radii = np.maximum((self.size[idx] * scale).astype(np.int64), 1)
+        alpha_steps = np.clip(np.ceil(self.life[idx] * ALPHA_STEPS), 1, ALPHA_STEPS).astype(np.int64)
+        xs = (offset[0] + self.pos[idx, 0] * scale - radii).astype(np.int64)
+        ys = (offset[1] + self.pos[idx, 1] * scale - radii).astype(np.int64)
+        colors = self.color[idx]
+        batch = [(self._sprite(tuple(c), r, a), (x, y))
+                 for c, r, a, x, y in zip(colors.tolist(), radii.tolist(), alpha_steps.tolist(), xs.tolist(), ys.tolist())]
+        return surface.blits(batch, doreturn=True)
@@ -1,5 +1,6 @@
 import math
 import numpy as np
+import settings
 
 def rotate_vector(vec, angle_degrees):
     theta = math.radians(angle_degrees)
@@ -118,4 +119,328 @@ def line_intersects_polygon(p1, p2, points):
             u = ((p3[0]-p1[0])*(p4[1]-p3[1]) - (p3[1]-p1[1])*(p4[0]-p3[0])) / d
             v = ((p3[0]-p1[0])*(p2[1]-p1[1]) - (p3[1]-p1[1])*(p2[0]-p1[0])) / d
             if 0 <= u <= 1 and 0 <= v <= 1: return True
-    return False
\ No newline at end of file
+    return False
+
+# --- STATIC EDGE BROADPHASE ---
+class EdgeGrid:
+    """Wall edges of a map bucketed into a uniform grid, built once at map load.
+
+    Every polygon edge is stored in each cell it passes through (cells are
+    padded by `EDGE_PAD` so edges that only graze a cell corner still count).
+    Circle queries only look at the cells under the circle's bounding box and
+    segment queries only at the cells the segment walks through.
+    """
+    EDGE_PAD = 1.0
+
+    def __init__(self, polygons, cell_size=50, width=None, height=None):
+        # Covers the arena by default, so a resized arena can't fall outside the grid
+        width = settings.GAME_WIDTH if width is None else width
+        height = settings.GAME_HEIGHT if height is None else height
+        self.polygons = polygons
+        self.cell_size = cell_size
+        self.cols = int(math.ceil(width / cell_size)) + 1
+        self.rows = int(math.ceil(height / cell_size)) + 1
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+
+        # (x1, y1, x2, y2, polygon_index) as plain floats: cheaper than tiny arrays
+        self.edges = []
+        for poly_index, poly in enumerate(polygons):
+            for i in range(len(poly)):
+                x1, y1 = poly[i]
+                x2, y2 = poly[(i + 1) % len(poly)]
+                edge_index = len(self.edges)
+                self.edges.append((float(x1), float(y1), float(x2), float(y2), poly_index))
+                for cell in self._cells_touching_edge(x1, y1, x2, y2):
+                    self.cells[cell].append(edge_index)
+
+        # --- PACKED EDGE ARRAYS (for batched queries) ---
+        packed = np.array([e[:4] for e in self.edges], dtype=np.float64).reshape(-1, 4)
+        self.edge_start = packed[:, :2].copy()
+        self.edge_vec = packed[:, 2:] - packed[:, :2]
+        edge_len2 = np.einsum("ij,ij->i", self.edge_vec, self.edge_vec)
+        self.edge_valid = edge_len2 > 0
+        # Squared lengths (1 for degenerate edges). Projections divide by these rather
+        # than multiplying by a reciprocal so vertex hits round exactly like the scalar code
+        safe_len2 = np.where(self.edge_valid, edge_len2, 1.0)
+        self.edge_len2 = safe_len2
+        # Left-hand unit normal, used when a circle center sits exactly on an edge
+        self.edge_normal = np.stack([-self.edge_vec[:, 1], self.edge_vec[:, 0]], axis=1) / np.sqrt(safe_len2)[:, None]
+        self.edge_poly = np.array([e[4] for e in self.edges], dtype=np.int64)
+        # Edges of one polygon are contiguous: polygon k owns edges [poly_bounds[k], poly_bounds[k+1])
+        self.poly_bounds = np.searchsorted(self.edge_poly, np.arange(len(polygons) + 1))
+
+        # Optional pvs.PVS table; when set, line-of-sight checks try it before raycasting
+        self.pvs = None
+        # Optional sdf.DistanceField; when set, free-space and escape queries use it
+        self.sdf = None
+        # Optional nav.NavGrid; when set, bots steer by its next-hop table
+        self.nav = None
+
+    def _cell_range(self, lo, hi, count):
+        cs = self.cell_size
+        return range(max(0, int(lo // cs)), min(count - 1, int(hi // cs)) + 1)
+
+    def _cells_touching_edge(self, x1, y1, x2, y2):
+        cs, pad = self.cell_size, self.EDGE_PAD
+        for cx in self._cell_range(min(x1, x2) - pad, max(x1, x2) + pad, self.cols):
+            for cy in self._cell_range(min(y1, y2) - pad, max(y1, y2) + pad, self.rows):
+                box = (cx * cs - pad, cy * cs - pad, (cx + 1) * cs + pad, (cy + 1) * cs + pad)
+                if _segment_touches_box(x1, y1, x2, y2, box):
+                    yield cy * self.cols + cx
+
+    def edges_near(self, pos, radius):
+        """Indices of edges stored in any cell overlapping the square around `pos`."""
+        found = set()
+        for cx in self._cell_range(pos[0] - radius, pos[0] + radius, self.cols):
+            for cy in self._cell_range(pos[1] - radius, pos[1] + radius, self.rows):
+                found.update(self.cells[cy * self.cols + cx])
+        return found
+
+    def edges_along(self, start, end):
+        """Indices of edges stored in the cells the segment start->end walks through."""
+        cs = self.cell_size
+        x0, y0 = float(start[0]), float(start[1])
+        x1, y1 = float(end[0]), float(end[1])
+        cx, cy = int(x0 // cs), int(y0 // cs)
+        end_cx, end_cy = int(x1 // cs), int(y1 // cs)
+        dx, dy = x1 - x0, y1 - y0
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # Distance along the segment (in units of t) to the next vertical / horizontal cell border
+        t_delta_x = abs(cs / dx) if dx else math.inf
+        t_delta_y = abs(cs / dy) if dy else math.inf
+        t_max_x = (((cx + (step_x > 0)) * cs - x0) / dx) if dx else math.inf
+        t_max_y = (((cy + (step_y > 0)) * cs - y0) / dy) if dy else math.inf
+
+        found = set()
+        cols, rows, cells = self.cols, self.rows, self.cells
+        for _ in range(abs(end_cx - cx) + abs(end_cy - cy) + 1):
+            if 0 <= cx < cols and 0 <= cy < rows:
+                found.update(cells[cy * cols + cx])
+            if t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+        # Float drift can cut the walk one cell short; the end cell always counts
+        if 0 <= end_cx < cols and 0 <= end_cy < rows:
+            found.update(cells[end_cy * cols + end_cx])
+        return found
+
+    def segment_hits(self, start, end):
+        """Same answer as `line_intersects_polygon` over every polygon, but only for nearby edges."""
+        ax, ay = float(start[0]), float(start[1])
+        bx, by = float(end[0]), float(end[1])
+        rx, ry = bx - ax, by - ay
+        edges = self.edges
+        for i in self.edges_along(start, end):
+            x3, y3, x4, y4, _ = edges[i]
+            sx, sy = x4 - x3, y4 - y3
+            d = rx * sy - ry * sx
+            if d != 0:
+                u = ((x3 - ax) * sy - (y3 - ay) * sx) / d
+                v = ((x3 - ax) * ry - (y3 - ay) * rx) / d
+                if 0 <= u <= 1 and 0 <= v <= 1: return True
+        return False
+
+    def segment_first_hit(self, start, end):
+        """Fraction (0..1) of the way from `start` to `end` where the segment first
+        crosses a wall edge, or None if it crosses none. Same hit test as `segment_hits`."""
+        idx = np.fromiter(self.edges_along(start, end), dtype=np.int64)
+        if not len(idx):
+            return None
+        ax, ay = float(start[0]), float(start[1])
+        rx, ry = float(end[0]) - ax, float(end[1]) - ay
+        sx, sy = self.edge_vec[idx, 0], self.edge_vec[idx, 1]
+        qx, qy = self.edge_start[idx, 0] - ax, self.edge_start[idx, 1] - ay
+        d = rx * sy - ry * sx
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u = (qx * sy - qy * sx) / d
+            v = (qx * ry - qy * rx) / d
+        hit = (d != 0) & (0 <= u) & (u <= 1) & (0 <= v) & (v <= 1)
+        return float(u[hit].min()) if hit.any() else None
+
+    def circle_pushes(self, pos, radius):
+        """Push vectors for a circle at `pos`: one per overlapping polygon, as
+        `resolve_circle_polygon` would return it (the deepest edge wins)."""
+        px, py = float(pos[0]), float(pos[1])
+        r2 = radius * radius
+        best = {}
+        edges = self.edges
+        for i in self.edges_near(pos, radius):
+            x1, y1, x2, y2, poly_index = edges[i]
+            ex, ey = x2 - x1, y2 - y1
+            elen2 = ex * ex + ey * ey
+            if elen2 == 0: continue
+            t = max(0.0, min(1.0, ((px - x1) * ex + (py - y1) * ey) / elen2))
+            dx, dy = px - (x1 + t * ex), py - (y1 + t * ey)
+            dist2 = dx * dx + dy * dy
+            if dist2 < r2:
+                dist = math.sqrt(dist2)
+                if dist == 0:
+                    elen = math.sqrt(elen2)
+                    nx, ny, overlap = -ey / elen, ex / elen, radius
+                else:
+                    nx, ny, overlap = dx / dist, dy / dist, radius - dist
+                if poly_index not in best or overlap > best[poly_index][0]:
+                    best[poly_index] = (overlap, nx, ny)
+        return [np.array([nx * overlap, ny * overlap]) for overlap, nx, ny in best.values()]
+
+    def circle_hits(self, pos, radius):
+        """True if a circle at `pos` overlaps any wall edge (early exit, no push vectors)."""
+        px, py = float(pos[0]), float(pos[1])
+        r2 = radius * radius
+        edges = self.edges
+        for i in self.edges_near(pos, radius):
+            x1, y1, x2, y2, _ = edges[i]
+            ex, ey = x2 - x1, y2 - y1
+            elen2 = ex * ex + ey * ey
+            if elen2 == 0: continue
+            t = max(0.0, min(1.0, ((px - x1) * ex + (py - y1) * ey) / elen2))
+            dx, dy = px - (x1 + t * ex), py - (y1 + t * ey)
+            if dx * dx + dy * dy < r2: return True
+        return False
+
+    def resolve_circles(self, positions, radii):
+        """Batched `resolve_circle_polygon` for many circles against every edge in one pass.
+
+        `positions` is (n, 2) and `radii` a scalar or (n,). Returns `(pushes, hit)`
+        with pushes shaped (n, polygons, 2) and hit shaped (n, polygons):
+        pushes[i, k] is exactly what resolve_circle_polygon(positions[i], radii[i],
+        polygons[k]) would return.
+        """
+        pos = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        n = len(pos)
+        r = np.broadcast_to(np.asarray(radii, dtype=np.float64), (n,))
+
+        rel = pos[:, None, :] - self.edge_start[None, :, :]                      # (n, E, 2)
+        t = np.clip(np.einsum("nek,ek->ne", rel, self.edge_vec) / self.edge_len2, 0.0, 1.0)
+        diff = rel - t[:, :, None] * self.edge_vec[None, :, :]
+        dist2 = np.einsum("nek,nek->ne", diff, diff)
+        edge_hit = (dist2 < (r * r)[:, None]) & self.edge_valid[None, :]
+
+        dist = np.sqrt(dist2)
+        on_edge = dist == 0
+        safe = np.where(on_edge, 1.0, dist)
+        normal = np.where(on_edge[:, :, None], self.edge_normal[None, :, :], diff / safe[:, :, None])
+        overlap = np.where(on_edge, r[:, None], r[:, None] - dist)
+        overlap = np.where(edge_hit, overlap, -np.inf)
+
+        n_polys = len(self.poly_bounds) - 1
+        pushes = np.zeros((n, n_polys, 2))
+        hit = np.zeros((n, n_polys), dtype=bool)
+        rows = np.arange(n)
+        for k in range(n_polys):
+            lo, hi = self.poly_bounds[k], self.poly_bounds[k + 1]
+            if lo == hi: continue
+            # argmax keeps the first deepest edge, like the strict '>' in resolve_circle_polygon
+            best = lo + np.argmax(overlap[:, lo:hi], axis=1)
+            depth = overlap[rows, best]
+            hit[:, k] = depth > -np.inf
+            pushes[:, k] = normal[rows, best] * np.where(hit[:, k], depth, 0.0)[:, None]
+        return pushes, hit
+
+    def resolve_all(self, pos, vel, radii, passes=1, bounds=None):
+        """Push circles out of the walls and cancel their velocity into them, in place.
+
+        `pos` and `vel` are (n, 2) float arrays; `radii` a scalar or (n,). Each pass
+        is one `resolve_circles` call over the circles the previous pass pushed.
+        With `bounds` = (width, height), pushed centers are clamped to the arena
+        after every pass. Returns the (n,) mask of circles that were pushed.
+        """
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (len(pos),))
+        rows = np.arange(len(pos))
+        moved = np.zeros(len(pos), dtype=bool)
+        for _ in range(passes):
+            if not len(rows):
+                break
+            pushes, hit = self.resolve_circles(pos[rows], radii[rows])
+            touched = hit.any(axis=1)
+            if not touched.any():
+                break
+            p = pos[rows] + pushes.sum(axis=1)
+            v = vel[rows]
+            for k in range(pushes.shape[1]):
+                into_rows = np.flatnonzero(hit[:, k])
+                if len(into_rows) == 0: continue
+                normal = pushes[into_rows, k] / np.linalg.norm(pushes[into_rows, k], axis=1)[:, None]
+                dot = np.einsum("ij,ij->i", v[into_rows], normal)
+                into = dot < 0
+                v[into_rows[into]] -= dot[into, None] * normal[into]
+            if bounds is not None:
+                np.clip(p[:, 0], 0, bounds[0], out=p[:, 0])
+                np.clip(p[:, 1], 0, bounds[1], out=p[:, 1])
+            rows = rows[touched]
+            pos[rows] = p[touched]
+            vel[rows] = v[touched]
+            moved[rows] = True
+        return moved
+
+    def circles_free(self, positions, radii):
+        """(n,) mask of circles that touch no wall edge, in one vectorized pass."""
+        pos = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        r = np.broadcast_to(np.asarray(radii, dtype=np.float64), (len(pos),))
+        rel = pos[:, None, :] - self.edge_start[None, :, :]
+        t = np.clip(np.einsum("nek,ek->ne", rel, self.edge_vec) / self.edge_len2, 0.0, 1.0)
+        diff = rel - t[:, :, None] * self.edge_vec[None, :, :]
+        dist2 = np.einsum("nek,nek->ne", diff, diff)
+        return ~((dist2 < (r * r)[:, None]) & self.edge_valid[None, :]).any(axis=1)
+
+    def nearest_edge_normal(self, pos, search_radius=150):
+        """Unit vector from the closest nearby wall point towards `pos` (None if no wall is near)."""
+        px, py = float(pos[0]), float(pos[1])
+        best_dist, normal = math.inf, None
+        edges = self.edges
+        for i in self.edges_near(pos, search_radius):
+            x1, y1, x2, y2, _ = edges[i]
+            ex, ey = x2 - x1, y2 - y1
+            elen2 = ex * ex + ey * ey
+            if elen2 == 0: continue
+            t = max(0.0, min(1.0, ((px - x1) * ex + (py - y1) * ey) / elen2))
+            dx, dy = px - (x1 + t * ex), py - (y1 + t * ey)
+            d = math.hypot(dx, dy)
+            if 1e-6 < d < best_dist:
+                best_dist, normal = d, np.array([dx / d, dy / d])
+        return normal
+
+
+def _segment_touches_box(x1, y1, x2, y2, box):
+    """Liang-Barsky clip test: does the segment overlap the axis-aligned box?"""
+    xmin, ymin, xmax, ymax = box
+    t0, t1 = 0.0, 1.0
+    dx, dy = x2 - x1, y2 - y1
+    for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+        if p == 0:
+            if q < 0: return False
+        else:
+            t = q / p
+            if p < 0:
+                if t > t1: return False
+                t0 = max(t0, t)
+            else:
+                if t < t0: return False
+                t1 = min(t1, t)
+    return True
+
+
+_EDGE_GRIDS = {}
+
+def get_edge_grid(polygons):
+    """Build (once per distinct map) and return the EdgeGrid for `polygons`."""
+    key = tuple(tuple(tuple(pt) for pt in poly) for poly in polygons)
+    grid = _EDGE_GRIDS.get(key)
+    if grid is None:
+        grid = _EDGE_GRIDS[key] = EdgeGrid(polygons)
+    return grid
+
+
+def circle_pushes(pos, radius, geometry):
+    """Push vectors for a circle against the map (an EdgeGrid or a plain polygon list)."""
+    if isinstance(geometry, EdgeGrid):
+        return geometry.circle_pushes(pos, radius)
+    pushes = []
+    for poly in geometry:
+        hit, push = resolve_circle_polygon(pos, radius, poly)
+        if hit: pushes.append(push)
+    return pushes
@@ -0,0 +1,96 @@
+"""Built-in frame profiler: phase timers, rolling percentiles, Chrome-trace export.
+
+Instrumented code reads the module global `current`, which is None unless
+profiling has been switched on, so the disabled cost is one global load and a
+truth test per phase:
+
+    prof = profiler.current
+    if prof: t = prof.now()
+    ...                                      # the phase being measured
+    if prof: t = prof.lap("logic.stuck", t, self.name)
+
+`lap` charges the time since `t` to the phase and returns the current time,
+so consecutive phases chain without extra clock reads. The renderer calls
+`end_frame()` once per displayed frame; per-frame totals of every phase go
+into a rolling window for percentiles, and the raw spans of the last few
+seconds are kept for `export_chrome_trace` (open the file in chrome://tracing
+or https://ui.perfetto.dev).
+"""
+import os
+import json
+import time
+from collections import defaultdict, deque
+import numpy as np
+
+# Frames of per-phase totals kept for the rolling percentiles
+WINDOW = 300
+# Frames of raw spans kept for trace export
+TRACE_FRAMES = 240
+PERCENTILES = (50, 95, 99)
+TRACE_DIR = "profiles"
+
+current = None
+
+
+def toggle():
+    """Switch profiling on (with a fresh profiler) or off; returns the new state."""
+    global current
+    current = None if current else Profiler()
+    return current is not None
+
+
+class Profiler:
+    now = staticmethod(time.perf_counter)
+
+    def __init__(self, window=WINDOW, trace_frames=TRACE_FRAMES):
+        self.window = window
+        self.totals = {}  # phase -> deque of per-frame milliseconds
+        self.frame_ms = defaultdict(float)
+        self.spans = []  # (phase, start, duration, actor) of the frame in progress
+        self.trace = deque(maxlen=trace_frames)
+        self.frames = 0
+        self.frame_start = self.now()
+
+    def lap(self, phase, start, actor=None):
+        end = time.perf_counter()
+        self.frame_ms[phase] += (end - start) * 1000.0
+        self.spans.append((phase, start, end - start, actor))
+        return end
+
+    def end_frame(self):
+        """Close the current frame: fold its phase totals into the rolling window."""
+        end = self.lap("frame", self.frame_start)
+        for phase in self.frame_ms.keys() - self.totals.keys():
+            self.totals[phase] = deque([0.0] * min(self.frames, self.window), maxlen=self.window)
+        for phase, values in self.totals.items():
+            # A phase that didn't run this frame still counts, as a zero
+            values.append(self.frame_ms.get(phase, 0.0))
+        self.trace.append(self.spans)
+        self.frame_ms = defaultdict(float)
+        self.spans = []
+        self.frames += 1
+        self.frame_start = end
+
+    def percentiles(self):
+        """[(phase, p50, p95, p99)] in milliseconds per frame, slowest p95 first."""
+        rows = [(phase, *np.percentile(values, PERCENTILES).tolist()) for phase, values in self.totals.items() if values]
+        rows.sort(key=lambda row: -row[2])
+        return rows
+
+    def export_chrome_trace(self, path=None):
+        """Write the recorded frames as Chrome trace-event JSON and return the path."""
+        if path is None:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            path = os.path.join(TRACE_DIR, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        pid = os.getpid()
+        events = []
+        for spans in self.trace:
+            for phase, start, duration, actor in spans:
+                event = {"name": phase, "cat": phase.split(".")[0], "ph": "X", "pid": pid, "tid": 0,
+                         "ts": round(start * 1e6, 1), "dur": round(duration * 1e6, 1)}
+                if actor is not None:
+                    event["args"] = {"bot": actor}
+                events.append(event)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
@@ -0,0 +1,160 @@
+import math
+import numpy as np
+import settings
+from event_log import log_event
+
+# Thrown weapons fly this many px per reference tick (see settings.TICK_SCALE)
+THROW_SPEED = 10
+# Weapon hitbox (length along the flight direction, width)
+WEAPON_SIZE = (50, 16)
+
+
+def ticks_to_leave(x, step, limit):
+    """First tick k >= 1 at which x + k * step is outside the open range (0, limit)."""
+    if not 0 < x + step < limit:
+        return 1
+    if step > 0:
+        return math.ceil((limit - x) / step)
+    if step < 0:
+        return math.ceil(x / -step)
+    return math.inf
+
+
+class Projectiles:
+    """Every weapon in flight, advanced and hit-tested together once per tick.
+
+    A thrown weapon flies straight at constant speed, so when it will hit a
+    wall (or leave the arena) is known the moment it leaves the hand: `launch`
+    casts the whole path once and stores the impact tick. `step` then only
+    moves the positions, grounds the weapons whose tick has come, and sweeps
+    the rest against every living enemy in one array test (the same
+    circle-vs-rotated-rect test as `physics.check_circle_rotated_rect`).
+
+    The owning gladiator keeps `weapon_pos` / `weapon_flying` up to date for
+    the AI and the renderer.
+    """
+    def __init__(self):
+        self.owners = []
+        self.pos = np.zeros((0, 2))
+        self.dir = np.zeros((0, 2))
+        self.team = np.zeros(0, dtype=np.int64)
+        # Ticks until the weapon stops, and whether it stops against a wall (else the arena edge)
+        self.ticks_left = np.zeros(0, dtype=np.int64)
+        self.hits_wall = np.zeros(0, dtype=bool)
+
+    def __len__(self):
+        return len(self.owners)
+
+    def __contains__(self, owner):
+        return owner in self.owners
+
+    def launch(self, owner, geometry):
+        """Start tracking `owner`'s freshly thrown weapon (weapon_pos / weapon_dir set by the throw)."""
+        start = owner.weapon_pos.copy()
+        step = owner.weapon_dir * THROW_SPEED * settings.TICK_SCALE
+        ticks = min(ticks_to_leave(start[0], step[0], settings.GAME_WIDTH),
+                    ticks_to_leave(start[1], step[1], settings.GAME_HEIGHT))
+        # Tick k sweeps the step from k-1 to k, so a wall at s steps is reached on tick ceil(s)
+        hit = geometry.segment_first_hit(start, start + step * ticks)
+        if hit is not None:
+            ticks = max(1, math.ceil(hit * ticks))
+
+        self.owners.append(owner)
+        self.pos = np.vstack([self.pos, start])
+        self.dir = np.vstack([self.dir, owner.weapon_dir])
+        self.team = np.append(self.team, owner.team_id)
+        self.ticks_left = np.append(self.ticks_left, ticks)
+        self.hits_wall = np.append(self.hits_wall, hit is not None)
+
+    def step(self, players, events):
+        """Advance every weapon one tick; `players` are this tick's living players."""
+        if not self.owners:
+            return
+        # A bot that died drops its weapon out of the air
+        keep = np.array([o.alive and o.weapon_flying for o in self.owners])
+        if not keep.all():
+            self._keep(keep)
+            if not self.owners:
+                return
+
+        self.pos += self.dir * THROW_SPEED * settings.TICK_SCALE
+        self.ticks_left -= 1
+        done = self.ticks_left <= 0
+        for i in np.flatnonzero(done):
+            self._land(i, events)
+
+        targets = [e for e in players if e.alive]
+        flying = np.flatnonzero(~done)
+        if targets and len(flying):
+            for i, e in self._sweep(flying, targets):
+                self._hit(i, e, events)
+                done[i] = True
+
+        for i in np.flatnonzero(~done):
+            self.owners[i].weapon_pos = self.pos[i].copy()
+        if done.any():
+            self._keep(~done)
+
+    def _sweep(self, rows, targets):
+        """(projectile index, enemy) for each weapon touching an enemy this tick.
+        Lazy, so an enemy killed by an earlier weapon is skipped for the later ones;
+        among several candidates the first in `targets` order takes the hit."""
+        centers = np.array([e.pos for e in targets])
+        radii = np.array([e.radius for e in targets], dtype=np.float64)
+        teams = np.array([e.team_id for e in targets])
+        # Enemy centers in each weapon's frame: x along the flight direction
+        rel = centers[None, :, :] - self.pos[rows, None, :]
+        dx, dy = self.dir[rows, 0, None], self.dir[rows, 1, None]
+        local_x = rel[..., 0] * dx + rel[..., 1] * dy
+        local_y = rel[..., 1] * dx - rel[..., 0] * dy
+        half_w, half_h = WEAPON_SIZE[0] / 2, WEAPON_SIZE[1] / 2
+        gap_x = local_x - np.clip(local_x, -half_w, half_w)
+        gap_y = local_y - np.clip(local_y, -half_h, half_h)
+        contact = (gap_x * gap_x + gap_y * gap_y < radii * radii) & (teams[None, :] != self.team[rows, None])
+        for r in np.flatnonzero(contact.any(axis=1)):
+            i = rows[r]
+            for col in np.flatnonzero(contact[r]):
+                if targets[col].alive:
+                    yield i, targets[col]
+                    break
+
+    def _land(self, i, events):
+        owner = self.owners[i]
+        owner.weapon_flying = False
+        pos, direction = self.pos[i], self.dir[i]
+        if self.hits_wall[i]:
+            # Back off to the last clear step, then by half the blade so it rests against the wall
+            sword_half_length = WEAPON_SIZE[0] / 2
+            owner.weapon_pos = pos - direction * (THROW_SPEED * settings.TICK_SCALE + sword_half_length)
+            hit_pos = owner.weapon_pos + direction * (sword_half_length + 5)
+            events.append(("sound", "collision"))
+            events.append(("particles", hit_pos[0], hit_pos[1], (255, 255, 0), 3, 5))
+            log_event(events, "wall_hit", owner.name, pos=hit_pos)
+        else:
+            owner.weapon_pos = np.array([np.clip(pos[0], 20, settings.GAME_WIDTH - 20),
+                                         np.clip(pos[1], 20, settings.GAME_HEIGHT - 20)])
+
+    def _hit(self, i, e, events):
+        owner = self.owners[i]
+        owner.weapon_flying = False
+        owner.weapon_pos = self.pos[i].copy()
+        e.hp -= owner.throw_dmg
+        owner.damage_dealt += owner.throw_dmg
+        log_event(events, "ranged_hit", owner.name, e.name, e.pos, owner.throw_dmg)
+        if e.hp <= 0:
+            e.alive = False
+            owner.kills += 1
+            events.append(("sound", "death"))
+            events.append(("kill", owner.name, "SNIPED", e.name))
+            log_event(events, "death", e.name, owner.name, e.pos, "SNIPED")
+        else:
+            events.append(("sound", "collision"))
+        events.append(("particles", e.pos[0], e.pos[1], (200, 0, 0), 5, 10))
+
+    def _keep(self, mask):
+        self.owners = [o for o, k in zip(self.owners, mask) if k]
+        self.pos = self.pos[mask]
+        self.dir = self.dir[mask]
+        self.team = self.team[mask]
+        self.ticks_left = self.ticks_left[mask]
+        self.hits_wall = self.hits_wall[mask]
@@ -0,0 +1,242 @@
+"""Potentially-visible-set table for a static map.
+
+The arena is cut into CELL_SIZE cells and visibility between every pair of
+open cells is precomputed once. Each pair lands in one of three states:
+
+  visible    - no wall edge touches the region every ray of the
+               `vision.check_line_of_sight` fan (primary ray plus the +-12px /
+               +-18px thickness rays) can sweep between the two cells
+  blocked    - a single wall edge properly crosses the primary ray for every
+               choice of endpoints in the two cells
+  ambiguous  - anything else, pairs where a wall runs through either cell,
+               and cells further apart than bots ever look
+
+Both known states are proven for every pair of points in the two cells, not
+sampled, so a lookup never disagrees with the raycast. Visible / blocked
+answer a line-of-sight query with one bit lookup; ambiguous pairs fall back to
+the exact raycast. The two bit planes are stored packed (one bit per pair) in
+cache/ like the SDF and nav tables (see geometry_cache) and memory-mapped, so
+tournament workers share one copy of the pages.
+
+Unlike those tables, building is an explicit step rather than something a
+match does on startup: it takes tens of seconds, and without a table LOS is
+simply raycast as before.
+
+    python pvs.py --build        # (re)build the table for map_config's map, then check it
+    python pvs.py --check 200000 # compare the table against raycasts on random point pairs
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import time
+import numpy as np
+import settings
+import map_config
+import physics
+import vision
+import geometry_cache
+
+PVS_VERSION = 2
+CELL_SIZE = 25
+# Pairs further apart than this (center to center) are never looked up in play
+MAX_RANGE = 800 + CELL_SIZE * 1.5
+# Cell pairs tested per vectorized pass while building
+BUILD_CHUNK = 2000
+# Widest perpendicular offset of the LOS ray fan, plus a margin for rounding
+FAN_HALF_WIDTH = max(abs(o) for o in vision.LOS_OFFSETS) + 1.0
+# Cross products within this of zero don't count as a proper crossing
+CROSS_EPS = 1e-3
+
+
+class PVS:
+    def __init__(self, planes, cell_size=CELL_SIZE, width=settings.GAME_WIDTH, height=settings.GAME_HEIGHT):
+        # planes[0] = visible bits, planes[1] = known (visible or blocked) bits; (2, cells, bytes)
+        self.planes = planes
+        self.cell_size = cell_size
+        self.cols = int(np.ceil(width / cell_size))
+        self.rows = int(np.ceil(height / cell_size))
+
+    def cell_of(self, pos):
+        cx, cy = int(pos[0] // self.cell_size), int(pos[1] // self.cell_size)
+        if 0 <= cx < self.cols and 0 <= cy < self.rows:
+            return cy * self.cols + cx
+        return None
+
+    def lookup(self, a, b):
+        """True / False when the table knows the answer, None when a raycast is needed."""
+        ca, cb = self.cell_of(a), self.cell_of(b)
+        if ca is None or cb is None:
+            return None
+        byte, shift = cb >> 3, 7 - (cb & 7)
+        if not (self.planes[1, ca, byte] >> shift) & 1:
+            return None
+        return bool((self.planes[0, ca, byte] >> shift) & 1)
+
+
+def _corners(cells, cols, cs):
+    """(m, 4, 2) corners of each cell's closed box."""
+    x0, y0 = (cells % cols) * cs, (cells // cols) * cs
+    xs = np.stack([x0, x0 + cs, x0, x0 + cs], axis=1)
+    ys = np.stack([y0, y0, y0 + cs, y0 + cs], axis=1)
+    return np.stack([xs, ys], axis=2).astype(np.float64)
+
+
+def _swept_clear(ca, cb, half, p, q):
+    """(m,) mask of cell pairs whose swept box touches no wall edge.
+
+    Every fan ray between a point of cell A and a point of cell B lies in the
+    box of half-size `half` (cell half-size + fan offset) swept from A's center
+    `ca` to B's center `cb`. That region is convex with edge normals x, y and
+    perp(cb - ca), so with the edge's own normal these axes are enough for an
+    exact separating-axis test against each edge p->q."""
+    def separated(n):
+        # n: (m, E, 2) axis per pair and edge
+        reach = half * (np.abs(n[..., 0]) + np.abs(n[..., 1]))
+        pa, pb = np.einsum("mk,mek->me", ca, n), np.einsum("mk,mek->me", cb, n)
+        pp, pq = np.einsum("ek,mek->me", p, n), np.einsum("ek,mek->me", q, n)
+        return ((np.maximum(pp, pq) < np.minimum(pa, pb) - reach) |
+                (np.minimum(pp, pq) > np.maximum(pa, pb) + reach))
+
+    m, e = len(ca), len(p)
+    d = cb - ca
+    e_vec = q - p
+    axes = [np.broadcast_to(np.array([1.0, 0.0]), (m, e, 2)),
+            np.broadcast_to(np.array([0.0, 1.0]), (m, e, 2)),
+            np.broadcast_to(np.stack([-d[:, 1], d[:, 0]], axis=1)[:, None, :], (m, e, 2)),
+            np.broadcast_to(np.stack([-e_vec[:, 1], e_vec[:, 0]], axis=1)[None, :, :], (m, e, 2))]
+    apart = np.zeros((m, e), dtype=bool)
+    for n in axes:
+        apart |= separated(n)
+    return apart.all(axis=1)
+
+
+def _cut_by_one_edge(corners_a, corners_b, p, q):
+    """(m,) mask of cell pairs where some single wall edge properly crosses the
+    segment a->b for every a in cell A and b in cell B.
+
+    Both crossing conditions (a and b on opposite sides of the edge's line, the
+    edge's ends on opposite sides of line ab) are signs of functions that are
+    linear in each endpoint coordinate separately, so their extremes over two
+    boxes sit at the corners: checking the 16 corner pairs is exact."""
+    a = corners_a[:, :, None, :]  # (m, 4, 1, 2)
+    b = corners_b[:, None, :, :]  # (m, 1, 4, 2)
+    ab = b - a                    # (m, 4, 4, 2)
+
+    def cross(u, v):
+        return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+    cut = np.zeros(len(corners_a), dtype=bool)
+    for (px, py), (qx, qy) in zip(p, q):
+        edge = np.array([qx - px, qy - py])
+        side_a = cross(edge, corners_a - (px, py))  # (m, 4)
+        side_b = cross(edge, corners_b - (px, py))
+        apart = (((side_a > CROSS_EPS).all(axis=1) & (side_b < -CROSS_EPS).all(axis=1)) |
+                 ((side_a < -CROSS_EPS).all(axis=1) & (side_b > CROSS_EPS).all(axis=1)))
+        at_p = cross(ab, np.array([px, py]) - a)    # (m, 4, 4)
+        at_q = cross(ab, np.array([qx, qy]) - a)
+        straddle = (((at_p > CROSS_EPS) & (at_q < -CROSS_EPS)).all(axis=(1, 2)) |
+                    ((at_p < -CROSS_EPS) & (at_q > CROSS_EPS)).all(axis=(1, 2)))
+        cut |= apart & straddle
+    return cut
+
+
+def build(polygons, cell_size=CELL_SIZE, log=print):
+    """Compute the packed (2, cells, bytes) visible/known bit planes for `polygons`."""
+    geometry = physics.get_edge_grid(polygons)
+    pvs = PVS(None, cell_size)
+    n = pvs.cols * pvs.rows
+    visible = np.zeros((n, n), dtype=bool)
+    known = np.zeros((n, n), dtype=bool)
+
+    # Open cells: no wall edge within the circle around the cell box
+    open_cells = []
+    for c in range(n):
+        x0, y0 = (c % pvs.cols) * cell_size, (c // pvs.cols) * cell_size
+        center = (x0 + cell_size / 2, y0 + cell_size / 2)
+        if x0 + cell_size > settings.GAME_WIDTH or y0 + cell_size > settings.GAME_HEIGHT:
+            continue
+        if geometry.circle_hits(center, cell_size / 2 * np.sqrt(2)):
+            continue
+        open_cells.append(c)
+    open_cells = np.array(open_cells)
+    centers = np.stack([(np.arange(n) % pvs.cols + 0.5) * cell_size,
+                        (np.arange(n) // pvs.cols + 0.5) * cell_size], axis=1)
+
+    ii, jj = np.triu_indices(len(open_cells))
+    a, b = open_cells[ii], open_cells[jj]
+    near = np.linalg.norm(centers[a] - centers[b], axis=1) <= MAX_RANGE
+    a, b = a[near], b[near]
+    log(f"PVS: {n} cells, {len(open_cells)} open, {len(a)} cell pairs to test")
+
+    p = geometry.edge_start[geometry.edge_valid]
+    q = p + geometry.edge_vec[geometry.edge_valid]
+    half = cell_size / 2 + FAN_HALF_WIDTH
+    start = time.perf_counter()
+    for lo in range(0, len(a), BUILD_CHUNK):
+        ca, cb = a[lo:lo + BUILD_CHUNK], b[lo:lo + BUILD_CHUNK]
+        clear = _swept_clear(centers[ca], centers[cb], half, p, q)
+        cut = np.zeros_like(clear)
+        rest = np.flatnonzero(~clear)
+        cut[rest] = _cut_by_one_edge(_corners(ca[rest], pvs.cols, cell_size),
+                                     _corners(cb[rest], pvs.cols, cell_size), p, q)
+        for x, y in ((ca, cb), (cb, ca)):
+            visible[x, y] = clear
+            known[x, y] = clear | cut
+    log(f"PVS: built in {time.perf_counter() - start:.1f}s, {known.mean():.1%} of pairs known")
+    return np.stack([np.packbits(visible, axis=1), np.packbits(known, axis=1)])
+
+
+def check(table, polygons, samples=100000, seed=0, log=print):
+    """Compare `table` with the exact ray fan on random point pairs; returns the
+    number of disagreements (always 0 for a correctly built table)."""
+    geometry = physics.EdgeGrid(polygons)
+    rng = np.random.default_rng(seed)
+    size = np.array([settings.GAME_WIDTH, settings.GAME_HEIGHT])
+    starts, ends = rng.uniform(0, size, (samples, 2)), rng.uniform(0, size, (samples, 2))
+    answers = [table.lookup(s, e) for s, e in zip(starts, ends)]
+    answered = np.array([ans is not None for ans in answers])
+    expected = vision.line_of_sight_batch(starts[answered], ends[answered], geometry)
+    got = np.array([ans for ans in answers if ans is not None], dtype=bool)
+    wrong = np.flatnonzero(got != expected)
+    for k in wrong[:10]:
+        i = np.flatnonzero(answered)[k]
+        log(f"PVS mismatch: {starts[i].round(2).tolist()} -> {ends[i].round(2).tolist()} table {got[k]}, raycast {expected[k]}")
+    log(f"PVS check: {answered.sum()} of {samples} random pairs answered by the table, {len(wrong)} mismatches")
+    return len(wrong)
+
+
+def table_path(polygons=None, cell_size=CELL_SIZE):
+    polygons = map_config.POLYGONS if polygons is None else polygons
+    return geometry_cache.cache_path("pvs", polygons, (PVS_VERSION, cell_size))
+
+
+_LOADED = {}
+
+def load(polygons=None, cell_size=CELL_SIZE):
+    """Memory-map the map's PVS table. Returns None if it hasn't been built."""
+    path = table_path(polygons, cell_size)
+    if path not in _LOADED:
+        planes = geometry_cache.load(path, mmap=True)
+        _LOADED[path] = PVS(planes, cell_size) if planes is not None else None
+    return _LOADED[path]
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+    parser = argparse.ArgumentParser(description="Build or check the PVS table for map_config's map")
+    parser.add_argument("--build", action="store_true",
+                        help="(re)build the table into cache/, then check it")
+    parser.add_argument("--check", type=int, metavar="N", default=None,
+                        help="compare the table with raycasts on N random point pairs (default 100000)")
+    args = parser.parse_args()
+    if not args.build and args.check is None:
+        parser.error("nothing to do; pass --build and/or --check N")
+    path = table_path()
+    if args.build:
+        geometry_cache.save(path, build(map_config.POLYGONS))
+        print(f"Wrote {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+    table = load()
+    if table is None:
+        sys.exit(f"No PVS table at {path}; run `python pvs.py --build` first")
+    sys.exit(1 if check(table, map_config.POLYGONS, args.check or 100000) else 0)
@@ -0,0 +1,61 @@
+"""Persistent cache of finished match results.
+
+A result is keyed by everything that can change it: the lineups (with the
+full BotStats values of every bot involved), the map, the seed, the sim
+tick rate and `match.ENGINE_VERSION`. Tweaking one bot's stats therefore only
+invalidates the matches that bot plays in.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+
+import roster
+import pvs
+import map_config
+from match import ENGINE_VERSION, TICK_RATE
+
+DEFAULT_PATH = os.path.join("cache", "results.sqlite")
+
+
+def match_key(teams, seed, polygons=None, map_name=None):
+    polygons = map_config.POLYGONS if polygons is None else polygons
+    map_name = map_config.MAP_IMAGE_FILE if map_name is None else map_name
+    payload = {
+        "engine": ENGINE_VERSION,
+        "seed": seed,
+        "tick_rate": TICK_RATE,
+        "map": map_name,
+        "polygons": [[list(pt) for pt in poly] for poly in polygons],
+        # Table answers can differ from a raycast at the margins, so it is part of the key
+        "pvs": os.path.basename(pvs.table_path(polygons)) if pvs.load(polygons) else None,
+        "teams": [[vars(roster.get_bot_by_name(name)) for name in names] for names in teams],
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT NOT NULL)")
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        row = self.conn.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        self.conn.execute("INSERT OR REPLACE INTO results (key, result) VALUES (?, ?)", (key, json.dumps(result)))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
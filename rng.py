@@ -0,0 +1,19 @@
+import random
+
+class MatchRandom:
+    """Seeded random streams owned by one match.
+
+    Each stream is derived from the match seed independently, so drawing from
+    one never shifts another: particle spread can't change who wins, and aim
+    jitter can't change where bots decide to walk.
+      ai       - scan timers, strafe flips, throw decisions, wander/patrol targets
+      aim      - throw angle jitter
+      cosmetic - particles and other visual-only noise
+    """
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.ai = random.Random(f"{seed}:ai")
+        self.aim = random.Random(f"{seed}:aim")
+        self.cosmetic = random.Random(f"{seed}:cosmetic")
@@ -1,4 +1,5 @@
 import random
+import settings
 
 class BotStats:
     def __init__(self, name, image_file, hp, speed, melee_dmg, throw_dmg, cooldown, aggression, strafe_rate, accuracy, melee_bias):
@@ -69,6 +70,40 @@ ALL_BOTS = [
     BotStats("Mike",      "mike.png",        hp=30, speed=2.0, melee_dmg=9, throw_dmg=9, cooldown=0, aggression=800, strafe_rate=1.0, accuracy=1.0, melee_bias=0.1),
 ]
 
+# --- FRANCHISES ---
+# The eight 4-bot teams above, in roster order (used by tournament.py)
+FRANCHISES = {
+    "Bikini Bottom":     ["SpongeBob", "Patrick", "Squidward", "Mr. Krabs"],
+    "Quahog":            ["Peter", "Stewie", "Brian", "Lois"],
+    "Mushroom Kingdom":  ["Mario", "Luigi", "Bowser", "Peach"],
+    "Springfield":       ["Homer", "Bart", "Lisa", "Marge"],
+    "Rings":             ["Sonic", "Knuckles", "Tails", "Shadow"],
+    "DC":                ["Superman", "Batman", "Flash", "Wonder"],
+    "South Park":        ["Cartman", "Kenny", "Kyle", "Stan"],
+    "Peanuts":           ["Charlie B", "Snoopy", "Lucy", "Woodstock"],
+}
+
+# Team colors for panels and health bars, from the roster comments above
+FRANCHISE_COLORS = {
+    "Bikini Bottom":     (255, 105, 180),
+    "Quahog":            (70, 130, 255),
+    "Mushroom Kingdom":  (255, 50, 50),
+    "Springfield":       (255, 220, 40),
+    "Rings":             (50, 255, 50),
+    "DC":                (150, 150, 170),
+    "South Park":        (240, 240, 240),
+    "Peanuts":           (255, 150, 30),
+}
+
+def free_for_all(names=None):
+    """Match teams (see MATCH_TEAMS) for a free-for-all between franchises (default: all eight)."""
+    return [(name, FRANCHISE_COLORS[name], FRANCHISES[name]) for name in (names or FRANCHISES)]
+
+def get_bot_by_name(name):
+    for bot in ALL_BOTS:
+        if bot.name == name: return bot
+    return ALL_BOTS[0]
+
 # --- MATCHUP CONFIG ---
 
 # 1. Custom Team Names (Displayed in UI)
@@ -78,4 +113,11 @@ TEAM_RED_TITLE   = "Everyone Else"
 # 2. Who is fighting?
 TEAM_GREEN_NAMES = ["Mike"]
 TEAM_RED_NAMES   = ["Patrick", "Homer", "Cartman", "Peter", "Charlie B", "Peach", "Wonder", "Tails",
-                    "Stewie", "Bowser", "Batman", "Shadow", "Spongebob", "Marge", "Lois"]
\ No newline at end of file
+                    "Stewie", "Bowser", "Batman", "Shadow", "Spongebob", "Marge", "Lois"]
+
+# 3. Teams in the live match, as (title, color, names). Any number of teams
+#    works, e.g. MATCH_TEAMS = free_for_all() for all eight franchises at once.
+MATCH_TEAMS = [
+    (TEAM_GREEN_TITLE, settings.GREEN_TEAM_COLOR, TEAM_GREEN_NAMES),
+    (TEAM_RED_TITLE, settings.RED_TEAM_COLOR, TEAM_RED_NAMES),
+]
@@ -0,0 +1,125 @@
+"""Signed distance field of the map walls.
+
+Distance from every point of a SPACING-pixel lattice to the nearest wall
+edge, negative inside a polygon, plus its normalized gradient (the direction
+that leads away from the closest wall). Free-space tests become a bilinear
+lookup instead of walking wall edges:
+
+    field.distance(pos) >= radius      # a circle of `radius` at `pos` is clear
+
+The field is built on first use for a map (well under a second) and cached
+under cache/, keyed by a hash of the polygons.
+"""
+import numpy as np
+import settings
+import map_config
+import physics
+import geometry_cache
+
+SDF_VERSION = 1
+SPACING = 4
+# Lattice points processed per NumPy pass while building
+BUILD_CHUNK = 4096
+
+
+class DistanceField:
+    def __init__(self, data, spacing=SPACING):
+        # data[0] = signed distance, data[1], data[2] = unit gradient (x, y); each (rows, cols)
+        self.data = data
+        self.spacing = spacing
+        self.rows, self.cols = data.shape[1:]
+        # Nested lists for the scalar lookups: indexing them is far cheaper than numpy scalars
+        self._dist = data[0].tolist()
+        self._gx = data[1].tolist()
+        self._gy = data[2].tolist()
+
+    def _cell(self, pos):
+        fx = min(max(pos[0] / self.spacing, 0.0), self.cols - 1.000001)
+        fy = min(max(pos[1] / self.spacing, 0.0), self.rows - 1.000001)
+        ix, iy = int(fx), int(fy)
+        return ix, iy, fx - ix, fy - iy
+
+    @staticmethod
+    def _lerp(grid, ix, iy, tx, ty):
+        r0, r1 = grid[iy], grid[iy + 1]
+        top = r0[ix] + (r0[ix + 1] - r0[ix]) * tx
+        bottom = r1[ix] + (r1[ix + 1] - r1[ix]) * tx
+        return top + (bottom - top) * ty
+
+    def distance(self, pos):
+        """Signed distance from `pos` to the nearest wall (negative inside a wall)."""
+        return self._lerp(self._dist, *self._cell(pos))
+
+    def gradient(self, pos):
+        """Unit vector pointing away from the nearest wall, or None on a ridge where it vanishes."""
+        cell = self._cell(pos)
+        gx, gy = self._lerp(self._gx, *cell), self._lerp(self._gy, *cell)
+        norm = (gx * gx + gy * gy) ** 0.5
+        if norm < 1e-6:
+            return None
+        return np.array([gx / norm, gy / norm])
+
+    def distances(self, points):
+        """Vectorized `distance` for an (n, 2) array of points."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        fx = np.clip(points[:, 0] / self.spacing, 0.0, self.cols - 1.000001)
+        fy = np.clip(points[:, 1] / self.spacing, 0.0, self.rows - 1.000001)
+        ix, iy = fx.astype(np.int64), fy.astype(np.int64)
+        tx, ty = fx - ix, fy - iy
+        d = self.data[0]
+        top = d[iy, ix] + (d[iy, ix + 1] - d[iy, ix]) * tx
+        bottom = d[iy + 1, ix] + (d[iy + 1, ix + 1] - d[iy + 1, ix]) * tx
+        return top + (bottom - top) * ty
+
+
+def build(polygons, spacing=SPACING):
+    """Compute the (3, rows, cols) float32 distance + gradient stack for `polygons`."""
+    geometry = physics.get_edge_grid(polygons)
+    cols = int(np.ceil(settings.GAME_WIDTH / spacing)) + 1
+    rows = int(np.ceil(settings.GAME_HEIGHT / spacing)) + 1
+    xs, ys = np.meshgrid(np.arange(cols) * spacing, np.arange(rows) * spacing)
+    points = np.stack([xs.ravel(), ys.ravel()], axis=1).astype(np.float64)
+
+    dist = np.full(len(points), np.inf)
+    if len(geometry.edges):
+        e_start, e_vec = geometry.edge_start[None], geometry.edge_vec[None]
+        e_end = e_start + e_vec
+        starts = geometry.poly_bounds[:-1]
+        # A polygon that encloses the whole arena is its outer wall: being inside it is normal
+        enclosing = np.array([min(x for x, _ in poly) <= 0 and min(y for _, y in poly) <= 0 and
+                              max(x for x, _ in poly) >= settings.GAME_WIDTH and
+                              max(y for _, y in poly) >= settings.GAME_HEIGHT for poly in polygons], dtype=bool)
+        for lo in range(0, len(points), BUILD_CHUNK):
+            p = points[lo:lo + BUILD_CHUNK, None, :]
+            # Unsigned distance to every edge (same projection as EdgeGrid.circle_hits)
+            w = p - e_start
+            t = np.clip(np.einsum("pek,pek->pe", w, np.broadcast_to(e_vec, w.shape)) / geometry.edge_len2, 0.0, 1.0)
+            closest = e_start + t[..., None] * e_vec
+            d = np.linalg.norm(p - closest, axis=2)
+            d = np.where(geometry.edge_valid, d, np.inf)
+            # Even-odd rule per polygon: count edges crossed by a ray towards +x
+            y1, y2 = e_start[..., 1], e_end[..., 1]
+            straddles = (y1 > p[..., 1]) != (y2 > p[..., 1])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_cross = e_start[..., 0] + (p[..., 1] - y1) * e_vec[..., 0] / e_vec[..., 1]
+            crossings = (straddles & (p[..., 0] < x_cross)).astype(np.int32)
+            inside = ((np.add.reduceat(crossings, starts, axis=1) % 2 == 1) & ~enclosing).any(axis=1)
+            dist[lo:lo + BUILD_CHUNK] = np.where(inside, -1.0, 1.0) * d.min(axis=1)
+
+    dist = dist.reshape(rows, cols)
+    gy, gx = np.gradient(dist, spacing)
+    norm = np.hypot(gx, gy)
+    norm[norm == 0] = 1.0
+    return np.stack([dist, gx / norm, gy / norm]).astype(np.float32)
+
+
+_LOADED = {}
+
+def load_or_build(polygons=None, spacing=SPACING):
+    """Return the map's DistanceField, loading it from cache/ or building and saving it."""
+    polygons = map_config.POLYGONS if polygons is None else polygons
+    path = geometry_cache.cache_path("sdf", polygons, (SDF_VERSION, spacing))
+    if path not in _LOADED:
+        data = geometry_cache.cached_array(path, lambda: build(polygons, spacing))
+        _LOADED[path] = DistanceField(data, spacing)
+    return _LOADED[path]
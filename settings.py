@@ -4,12 +4,54 @@ import pygame
 GAME_WIDTH = 900
 GAME_HEIGHT = 1200
 UI_WIDTH = 400 
+# Display refresh cap; rendering interpolates between sim ticks, so this can differ from SIM_HZ
 FPS = 60
 
+# --- SIMULATION CLOCK ---
+# Gameplay constants (speeds, cooldowns, friction, AI timers) are written per
+# tick at this reference rate
+BASE_SIM_HZ = 60
+# Sim ticks per second of game time. Lower it (e.g. 30) on weak hosts: each tick
+# then covers more game time, so a match plays at the same pace in fewer ticks,
+# though not tick-for-tick identical to a 60 Hz one
+SIM_HZ = 60
+
+# Longest real frame the accumulator will catch up on (e.g. after a window drag)
+MAX_FRAME_TIME = 0.25
+
+# --- TURBO ---
+# Game-time multiplier for each speed (keys 1-4, T cycles).
+# None means "as many ticks as fit in the frame budget".
+SPEED_STEPS = [1, 2, 8, None]
+# Share of each frame's time the simulation may use before the frame is drawn,
+# so fast-forwarding never drags the display below FPS
+TURBO_FRAME_BUDGET = 0.75
+
 # --- CALCULATED DIMENSIONS ---
 # (We will set the scale dynamically in main.py, but these are defaults)
 TOTAL_WIDTH = GAME_WIDTH + UI_WIDTH
 TOTAL_HEIGHT = GAME_HEIGHT
+# Reference ticks each sim tick stands for; per-tick amounts are scaled by it
+TICK_SCALE = BASE_SIM_HZ / SIM_HZ
+
+# --- SPRITES ---
+# Sprite sizes in game pixels; the renderer scales them with the display
+PLAYER_SPRITE_SIZE = 70
+WEAPON_SPRITE_HEIGHT = 55
+
+# --- SPRITE ROTATION CACHE ---
+# Sprites are drawn pre-rotated in steps of this many degrees (2 -> 180 bins per texture)
+SPRITE_ROTATION_STEP = 2
+# Memory bound for the pre-rotated sprites; least recently used ones are dropped first
+SPRITE_CACHE_MB = 256
+
+# --- PARTICLES ---
+# Most hit particles alive at once; bursts past this recycle the oldest
+PARTICLE_CAPACITY = 1024
+
+# --- EVENT LOG ---
+# Directory for structured match event logs (see event_log.py); None turns logging off
+EVENT_LOG_DIR = None
 
 # --- COLORS ---
 FLOOR_COLOR = (20, 20, 25)
@@ -19,6 +61,13 @@ RED_TEAM_COLOR = (255, 50, 50)
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 
+# --- SOUND ---
+# Mixer channels the voice manager may use (see sound_manager.py)
+SOUND_CHANNELS = 8
+# "auto" plays through pygame.mixer when it initialised, else stays silent;
+# "mixer" is the same but warns when there is no mixer, "null" is always silent
+SOUND_BACKEND = "auto"
+
 # --- COUNTDOWN AUDIO TIMING (MANUAL) ---
 # If you provide a single countdown audio file (`assets/countdown.wav`),
 # you can control how the on-screen numbers map to that audio by setting
@@ -1,131 +1,240 @@
+"""Sound effects through a small voice manager.
+
+Match sound events are not played directly. `request(name)` queues them and
+`flush()`, called once per displayed frame, decides what actually reaches the
+mixer:
+
+  - identical requests in the same flush merge into one play, louder the more
+    there were (a 10-bot pile-up is one big "swing", not ten)
+  - each effect has a cap of plays per time window; once it's reached, further
+    hits bump the volume of the voice that is still ringing instead
+  - the mixer gets a fixed channel budget (settings.SOUND_CHANNELS). When every
+    channel is busy, a new effect steals the lowest-priority voice, if that is
+    lower than its own, or is dropped
+
+The backend is pygame.mixer, or a null backend that only counts plays when
+there is no audio device (headless runs) or settings.SOUND_BACKEND = "null".
+"""
 import pygame
 import os
 import time
 import numpy as np
+import settings
 
-SOUND_CACHE = {}
-DEATH_CHANNEL = None  # Dedicated channel for death sounds
-LAST_WALK_TIME = 0  # Track last walk sound play time
+# name -> (file, volume, priority, window seconds, max plays per window)
+EFFECTS = {
+    "death":     ("death.wav",     1.0, 3, 0.10, 2),
+    "collision": ("collision.wav", 0.5, 2, 0.05, 2),
+    "swing":     ("swing.wav",     0.7, 1, 0.05, 2),
+    "throw":     ("throw.wav",     0.7, 1, 0.05, 2),
+    "walk":      ("walk.wav",      0.2, 0, 0.20, 1),
+}
+# Countdown cues outrank every match effect
+COUNTDOWN_PRIORITY = 4
+# Each extra merged hit adds this much of the base volume (capped at full volume)
+MERGE_GAIN = 0.25
 
-def load_sound(filename, volume=1.0):
-    """Load a sound effect with caching"""
-    if filename in SOUND_CACHE:
-        return SOUND_CACHE[filename]
-    
-    try:
+
+# --- BACKENDS ---
+class MixerBackend:
+    """pygame.mixer with a fixed number of channels."""
+    def __init__(self, channels):
+        pygame.mixer.set_num_channels(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+
+    def load(self, filename):
         path = os.path.join("assets", filename)
         # If the file doesn't exist, silently return None (avoid noisy warnings)
         if not os.path.exists(path):
             return None
-        sound = pygame.mixer.Sound(path)
-        sound.set_volume(min(1.0, volume))
-        SOUND_CACHE[filename] = sound
-        return sound
-    except Exception as e:
-        print(f"Warning: Could not load sound {filename}. ({e})")
+        try:
+            return pygame.mixer.Sound(path)
+        except Exception as e:
+            print(f"Warning: Could not load sound {filename}. ({e})")
+            return None
+
+    def tone(self, frequency, duration, volume, sample_rate=44100):
+        """A short sine-wave beep as a Sound (None if sndarray can't make one)."""
+        length = int(sample_rate * duration)
+        t = np.linspace(0, duration, length, False)
+        wave = 0.5 * np.sin(2 * np.pi * frequency * t)
+        audio = np.int16(wave * (2**15 - 1) * volume)
+        channels = pygame.mixer.get_init()[2]
+        if channels > 1:
+            audio = np.repeat(audio[:, None], channels, axis=1)
+        try:
+            return pygame.sndarray.make_sound(audio)
+        except Exception:
+            return None
+
+    def busy(self, i):
+        return self.channels[i].get_busy()
+
+    def play(self, i, sound, volume):
+        self.channels[i].set_volume(volume)
+        self.channels[i].play(sound)
+
+    def set_volume(self, i, volume):
+        self.channels[i].set_volume(volume)
+
+    def length(self, sound):
+        return sound.get_length()
+
+
+class NullBackend:
+    """Plays nothing; keeps the voice logic running and counts what would have played."""
+    def __init__(self, channels):
+        self.channels = [None] * channels
+        self.played = {}
+
+    def load(self, filename):
+        return filename if os.path.exists(os.path.join("assets", filename)) else None
+
+    def tone(self, frequency, duration, volume):
+        return ("tone", frequency, duration, volume)
+
+    def busy(self, i):
+        return False
+
+    def play(self, i, sound, volume):
+        self.played[sound] = self.played.get(sound, 0) + 1
+
+    def set_volume(self, i, volume):
+        pass
+
+    def length(self, sound):
         return None
 
-def play_sound(filename, volume=1.0):
-    """Load and play a sound effect immediately"""
-    sound = load_sound(filename, volume)
-    if sound:
-        sound.play()
-
-# Preload common sounds
-SWING_SOUND = None
-THROW_SOUND = None
-WALK_SOUND = None
-DEATH_SOUND = None
-COLLISION_SOUND = None
+
+# --- VOICE MANAGER ---
+class VoiceManager:
+    def __init__(self, backend, clock=time.perf_counter):
+        self.backend = backend
+        self.clock = clock
+        self.sounds = {name: backend.load(spec[0]) for name, spec in EFFECTS.items()}
+        self.pending = {}
+        # Per channel: (priority, start time, effect name) of the voice last started on it
+        self.voices = [None] * len(backend.channels)
+        # Per effect: start times of recent plays, and the channel / volume of the latest
+        self.recent = {name: [] for name in EFFECTS}
+        self.latest = {}
+        self.cues = {}
+
+    def request(self, name, count=1):
+        if name in EFFECTS:
+            self.pending[name] = self.pending.get(name, 0) + count
+
+    def flush(self):
+        """Play this frame's requests, highest priority first."""
+        if not self.pending:
+            return
+        now = self.clock()
+        for name in sorted(self.pending, key=lambda n: -EFFECTS[n][2]):
+            count = self.pending[name]
+            _, base_volume, priority, window, cap = EFFECTS[name]
+            volume = min(1.0, base_volume * (1 + MERGE_GAIN * (count - 1)))
+            recent = self.recent[name]
+            recent[:] = [t for t in recent if now - t < window]
+            if len(recent) >= cap:
+                self._reinforce(name, volume)
+                continue
+            if self.play(self.sounds[name], volume, priority, name, now):
+                recent.append(now)
+        self.pending.clear()
+
+    def play(self, sound, volume, priority, name=None, now=None):
+        """Start `sound` on a free channel (or steal one); returns True if it played."""
+        if sound is None:
+            return False
+        now = self.clock() if now is None else now
+        channel = self._free_channel(priority)
+        if channel is None:
+            return False
+        self.backend.play(channel, sound, volume)
+        self.voices[channel] = (priority, now, name)
+        if name is not None:
+            self.latest[name] = (channel, volume)
+        return True
+
+    def cue(self, frequency, duration=0.12, volume=0.6):
+        """Synthesized beep, built once per (frequency, duration, volume)."""
+        key = (frequency, duration, volume)
+        if key not in self.cues:
+            self.cues[key] = self.backend.tone(frequency, duration, volume)
+        return self.cues[key]
+
+    def _free_channel(self, priority):
+        victim, victim_key = None, None
+        for i, voice in enumerate(self.voices):
+            if voice is None or not self.backend.busy(i):
+                return i
+            # Lowest priority first, oldest among equals
+            key = (voice[0], voice[1])
+            if voice[0] < priority and (victim_key is None or key < victim_key):
+                victim, victim_key = i, key
+        return victim
+
+    def _reinforce(self, name, volume):
+        """Fold capped hits into the voice of the same effect that is still ringing."""
+        latest = self.latest.get(name)
+        if latest is None:
+            return
+        channel, playing_volume = latest
+        voice = self.voices[channel]
+        if voice is not None and voice[2] == name and self.backend.busy(channel):
+            louder = min(1.0, playing_volume + volume * MERGE_GAIN)
+            self.backend.set_volume(channel, louder)
+            self.latest[name] = (channel, louder)
+
+
+VOICES = None
 COUNTDOWN_SOUNDS = {}  # map int -> Sound
-LAST_COUNTDOWN_TIME = 0
 COUNTDOWN_SINGLE = None
 
 def init_sounds():
-    """Initialize all sound effects (call once at game start)"""
-    global SWING_SOUND, THROW_SOUND, WALK_SOUND, DEATH_SOUND, DEATH_CHANNEL, COLLISION_SOUND
-    
-    SWING_SOUND = load_sound("swing.wav", volume=0.7)
-    THROW_SOUND = load_sound("throw.wav", volume=0.7)
-    WALK_SOUND = load_sound("walk.wav", volume=0.2)
-    DEATH_SOUND = load_sound("death.wav", volume=1.0)
-    COLLISION_SOUND = load_sound("collision.wav", volume=0.5)
+    """Set up the voice manager and load every effect (call once at game start)"""
+    global VOICES, COUNTDOWN_SINGLE
+    if VOICES is not None:
+        return
+    use_mixer = settings.SOUND_BACKEND in ("auto", "mixer") and pygame.mixer.get_init()
+    if settings.SOUND_BACKEND == "mixer" and not use_mixer:
+        print("Warning: SOUND_BACKEND is \"mixer\" but pygame.mixer isn't initialised; sound is off.")
+    backend = (MixerBackend if use_mixer else NullBackend)(settings.SOUND_CHANNELS)
+    VOICES = VoiceManager(backend)
     # Try to preload countdown clips (3,2,1). If missing, we'll synthesize a beep on demand.
     for n in (3, 2, 1):
-        snd = load_sound(f"countdown_{n}.wav", volume=0.9)
+        snd = backend.load(f"countdown_{n}.wav")
         if snd:
             COUNTDOWN_SOUNDS[n] = snd
     # Also try a single countdown track (e.g. a 3-second file)
-    global COUNTDOWN_SINGLE
-    COUNTDOWN_SINGLE = load_sound("countdown.wav", volume=0.95)
-    
-    # Create a dedicated channel for death sounds (prevents overlapping)
-    DEATH_CHANNEL = pygame.mixer.Channel(0)
-    
-    # Silent in normal runs: avoid terminal output about loaded sounds
-
-def play_swing():
-    """Play swing sound effect"""
-    if SWING_SOUND:
-        SWING_SOUND.play()
-
-def play_throw():
-    """Play throw sound effect"""
-    if THROW_SOUND:
-        THROW_SOUND.play()
-
-def play_walk():
-    """Play walking sound effect (quiet) with slight delay between plays"""
-    global LAST_WALK_TIME
-    current_time = time.time()
-    if WALK_SOUND and (current_time - LAST_WALK_TIME) > 0.2:  # 100ms delay between plays
-        WALK_SOUND.play()
-        LAST_WALK_TIME = current_time
-
-def play_death():
-    """Play death sound effect - uses dedicated channel to ensure it plays"""
-    if DEATH_SOUND and DEATH_CHANNEL:
-        DEATH_CHANNEL.play(DEATH_SOUND)
-    else:
-        # Do not print warnings to terminal; silently ignore missing channel/sound
-        pass
+    COUNTDOWN_SINGLE = backend.load("countdown.wav")
 
-def play_collision():
-    """Play weapon collision sound effect"""
-    if COLLISION_SOUND:
-        COLLISION_SOUND.play()
-
-
-def _synthesize_beep(frequency=880.0, duration=0.12, volume=0.5, sample_rate=44100):
-    """Synthesize a short sine-wave beep and return a pygame Sound."""
-    length = int(sample_rate * duration)
-    t = np.linspace(0, duration, length, False)
-    wave = 0.5 * np.sin(2 * np.pi * frequency * t)
-    # convert to 16-bit signed
-    audio = np.int16(wave * (2**15 - 1) * volume)
-    try:
-        sound = pygame.sndarray.make_sound(audio)
-        return sound
-    except Exception as e:
-        # If sndarray not available or failure, fallback to None (silent)
-        return None
+def request(name, count=1):
+    """Queue a match sound event by name (see `match.py` for the event list)"""
+    if VOICES is not None:
+        VOICES.request(name, count)
+
+def flush():
+    """Play everything requested since the last flush (call once per frame)"""
+    if VOICES is not None:
+        VOICES.flush()
 
 
 def play_countdown(n: int):
     """Play countdown sound for number `n` (3/2/1).
 
-    Looks for `assets/countdown_3.wav`, etc. If not found, synthesizes a short beep.
+    Looks for `assets/countdown_3.wav`, etc. If not found, plays a synthesized
+    beep (built once per number and reused).
     """
+    if VOICES is None:
+        return
     if n in COUNTDOWN_SOUNDS:
-        COUNTDOWN_SOUNDS[n].play()
+        VOICES.play(COUNTDOWN_SOUNDS[n], 0.9, COUNTDOWN_PRIORITY)
         return
 
     # fallback: synthesize different frequency per number
     freq_map = {3: 720.0, 2: 880.0, 1: 1000.0}
-    freq = freq_map.get(n, 800.0)
-    snd = _synthesize_beep(frequency=freq, duration=0.12, volume=0.6)
-    if snd:
-        snd.play()
+    VOICES.play(VOICES.cue(freq_map.get(n, 800.0)), 1.0, COUNTDOWN_PRIORITY)
 
 
 def has_single_countdown():
@@ -133,29 +242,18 @@ def has_single_countdown():
 
 
 def play_countdown_single():
-    """Play the single countdown track (if available) and return its length in seconds.
+    """Play the single countdown track (if available).
 
-    Returns None if no single track is available.
+    Returns None: timing / segmentation for a single countdown audio is
+    controlled manually via `settings.py` (COUNTDOWN_SINGLE_LENGTH_MS or
+    COUNTDOWN_SINGLE_SEGMENTS_MS) rather than measured from the file.
     """
-    if COUNTDOWN_SINGLE:
-        try:
-            COUNTDOWN_SINGLE.play()
-            # NOTE: We intentionally do NOT return the audio length here.
-            # Timing / segmentation for a single countdown audio is controlled
-            # manually via `settings.py` (COUNTDOWN_SINGLE_LENGTH_MS or
-            # COUNTDOWN_SINGLE_SEGMENTS_MS). This avoids automatic length
-            # measurement and gives the user explicit control.
-            return None
-        except Exception as e:
-            # Silent on playback error
-            return None
+    if COUNTDOWN_SINGLE and VOICES is not None:
+        VOICES.play(COUNTDOWN_SINGLE, 0.95, COUNTDOWN_PRIORITY)
     return None
 
 
 def get_countdown_single_length():
-    if COUNTDOWN_SINGLE:
-        try:
-            return COUNTDOWN_SINGLE.get_length()
-        except Exception:
-            return None
+    if COUNTDOWN_SINGLE and VOICES is not None:
+        return VOICES.backend.length(COUNTDOWN_SINGLE)
     return None
@@ -0,0 +1,76 @@
+import heapq
+import math
+
+
+class SpatialHash:
+    """Uniform grid of live gladiators, rebuilt once per tick.
+
+    Positions are bucketed when `rebuild` is called, so players that move
+    during the tick may sit one cell off; callers query with a small margin
+    and then test exact distances.
+    """
+    def __init__(self, cell_size=100):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def rebuild(self, players):
+        cs = self.cell_size
+        cells = {}
+        for p in players:
+            if not p.alive: continue
+            key = (int(p.pos[0] // cs), int(p.pos[1] // cs))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [p]
+            else:
+                bucket.append(p)
+        self.cells = cells
+
+    def query(self, pos, radius):
+        """Return every player bucketed in a cell overlapping the square around `pos`."""
+        cs = self.cell_size
+        x0, x1 = int((pos[0] - radius) // cs), int((pos[0] + radius) // cs)
+        y0, y1 = int((pos[1] - radius) // cs), int((pos[1] + radius) // cs)
+        found = []
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket: found.extend(bucket)
+        return found
+
+    def iter_by_distance(self, pos, max_dist):
+        """Yield (dist, player) for players within `max_dist` of `pos`, closest first.
+
+        Cells are visited in square rings around `pos`; once ring r is done no
+        unvisited cell is closer than r * cell_size, so everything found up to
+        that distance can be yielded. Callers can stop at the first acceptable
+        player (e.g. the first one in line of sight) without scanning the rest.
+        """
+        cs = self.cell_size
+        px, py = pos[0], pos[1]
+        cx, cy = int(px // cs), int(py // cs)
+        cells = self.cells
+        heap = []
+        counter = 0
+        for ring in range(int(max_dist // cs) + 2):
+            if ring == 0:
+                keys = [(cx, cy)]
+            else:
+                keys = [(x, cy - ring) for x in range(cx - ring, cx + ring + 1)]
+                keys += [(x, cy + ring) for x in range(cx - ring, cx + ring + 1)]
+                keys += [(cx - ring, y) for y in range(cy - ring + 1, cy + ring)]
+                keys += [(cx + ring, y) for y in range(cy - ring + 1, cy + ring)]
+            for key in keys:
+                for p in cells.get(key, ()):
+                    d = math.hypot(p.pos[0] - px, p.pos[1] - py)
+                    if d < max_dist:
+                        heapq.heappush(heap, (d, counter, p))
+                        counter += 1
+            settled = ring * cs
+            while heap and heap[0][0] <= settled:
+                d, _, p = heapq.heappop(heap)
+                yield d, p
+        while heap:
+            d, _, p = heapq.heappop(heap)
+            yield d, p
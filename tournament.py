@@ -0,0 +1,254 @@
+"""Parallel tournament runner built on the headless `Match` engine.
+
+    python tournament.py franchises --games 40
+    python tournament.py gauntlet --challengers Mike 67 --games 20
+
+`franchises` plays every pairing of the 4-bot teams in `roster.FRANCHISES`.
+`gauntlet` puts each challenger alone against `roster.TEAM_RED_NAMES` (the
+same shape as the live 1-vs-N setup). Matches are fanned out over a process
+pool and reported as they finish; a matchup stops getting new games once its
+win-rate confidence interval no longer contains 50%.
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import hashlib
+import itertools
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import roster
+from match import Match
+import result_cache
+from result_cache import ResultCache, match_key
+
+# 95% two-sided normal quantile
+Z_95 = 1.96
+
+
+def wilson_interval(successes, games, z=Z_95):
+    """Wilson score interval for a win rate. Draws may be counted as half wins."""
+    if games == 0:
+        return 0.0, 1.0
+    p = successes / games
+    denom = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denom
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class Matchup:
+    def __init__(self, name_a, team_a, name_b, team_b):
+        self.name_a, self.team_a = name_a, team_a
+        self.name_b, self.team_b = name_b, team_b
+        self.wins_a = 0
+        self.wins_b = 0
+        self.draws = 0
+        self.scheduled = 0
+
+    @property
+    def games(self):
+        return self.wins_a + self.wins_b + self.draws
+
+    @property
+    def score_a(self):
+        """Win rate of side A, counting draws as half a win."""
+        return (self.wins_a + 0.5 * self.draws) / self.games if self.games else 0.5
+
+    def interval_a(self):
+        return wilson_interval(self.wins_a + 0.5 * self.draws, self.games)
+
+    def is_settled(self, min_games):
+        """True once we have enough games and the interval excludes a coin flip."""
+        if self.games < min_games:
+            return False
+        lo, hi = self.interval_a()
+        return lo > 0.5 or hi < 0.5
+
+    def record(self, winner):
+        if winner == 0: self.wins_a += 1
+        elif winner == 1: self.wins_b += 1
+        else: self.draws += 1
+
+
+# --- WORKER SIDE ---
+# Each worker process imports the engine and loads the map once, then reuses it
+_WORKER_POLYGONS = None
+_WORKER_EVENT_LOG = None
+
+def _init_worker(event_log_dir=None):
+    global _WORKER_POLYGONS, _WORKER_EVENT_LOG
+    import map_config
+    import physics
+    import pvs
+    import sdf
+    import nav
+    _WORKER_POLYGONS = map_config.POLYGONS
+    physics.get_edge_grid(_WORKER_POLYGONS)
+    pvs.load(_WORKER_POLYGONS)
+    sdf.load_or_build(_WORKER_POLYGONS)
+    nav.load_or_build(_WORKER_POLYGONS)
+    if event_log_dir:
+        from multiprocessing import util
+        from event_log import EventLogWriter
+        _WORKER_EVENT_LOG = EventLogWriter(event_log_dir)
+        # Pool workers exit without running atexit hooks; flush through multiprocessing's finalizers
+        util.Finalize(_WORKER_EVENT_LOG, _WORKER_EVENT_LOG.close, exitpriority=10)
+
+def _play(teams, seed):
+    return Match(teams, polygons=_WORKER_POLYGONS, seed=seed, event_log=_WORKER_EVENT_LOG).run_to_completion()
+
+
+def game_seed(base_seed, team_a, team_b, game_index):
+    """Stable per-game seed, independent of scheduling order and process."""
+    text = f"{base_seed}|{','.join(team_a)}|{','.join(team_b)}|{game_index}"
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "big")
+
+
+# --- MATCHUP BUILDERS ---
+def franchise_matchups(names=None):
+    names = names or list(roster.FRANCHISES)
+    return [Matchup(a, roster.FRANCHISES[a], b, roster.FRANCHISES[b])
+            for a, b in itertools.combinations(names, 2)]
+
+def gauntlet_matchups(challengers=None, opponents=None, opponents_title=None):
+    challengers = challengers or roster.TEAM_GREEN_NAMES
+    opponents = opponents or roster.TEAM_RED_NAMES
+    opponents_title = opponents_title or roster.TEAM_RED_TITLE
+    return [Matchup(name, [name], opponents_title, opponents) for name in challengers]
+
+
+def run_tournament(matchups, games=40, min_games=10, workers=None, early_stop=True,
+                   base_seed=0, cache=None, log=print, event_log_dir=None):
+    """Play up to `games` games per matchup on a process pool and return the matchups.
+
+    Game N of a matchup always uses the same seed, so with a `ResultCache`
+    only games whose key changed (lineup stats, map, engine version) are simulated.
+    With `event_log_dir`, every simulated game writes its structured event log
+    there (cached games are not replayed, so they add nothing to the log).
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    total_budget = games * len(matchups)
+    played = 0
+    simulated = 0
+    start = time.perf_counter()
+
+    def next_job():
+        # Round robin over matchups that still need games
+        open_matchups = [(i, m) for i, m in enumerate(matchups)
+                         if m.scheduled < games and not (early_stop and m.is_settled(min_games))]
+        if not open_matchups:
+            return None
+        i, m = min(open_matchups, key=lambda im: im[1].scheduled)
+        game_index = m.scheduled
+        m.scheduled += 1
+        # Alternate spawn sides so the top/bottom start doesn't bias the result
+        swapped = game_index % 2 == 1
+        teams = [m.team_b, m.team_a] if swapped else [m.team_a, m.team_b]
+        return i, teams, game_seed(base_seed, m.team_a, m.team_b, game_index), swapped
+
+    def record(index, swapped, result, source):
+        nonlocal played
+        m = matchups[index]
+        winner = result["winner"]
+        if swapped and winner is not None:
+            winner = 1 - winner
+        m.record(winner)
+        played += 1
+        rate = played / max(1e-9, time.perf_counter() - start)
+        winner_name = {0: m.name_a, 1: m.name_b}.get(winner, "draw")
+        settled = " (settled)" if early_stop and m.is_settled(min_games) else ""
+        log(f"[{played:>5}/{total_budget}] {m.name_a} vs {m.name_b}: {winner_name} "
+            f"in {result['ticks']} ticks ({source}) | {m.wins_a}-{m.wins_b}-{m.draws}{settled} | {rate:.2f} matches/s")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(event_log_dir,)) as pool:
+        pending = {}
+        while True:
+            while len(pending) < max_in_flight:
+                job = next_job()
+                if job is None: break
+                index, teams, seed, swapped = job
+                key = match_key(teams, seed) if cache else None
+                cached = cache.get(key) if cache else None
+                if cached is not None:
+                    record(index, swapped, cached, "cached")
+                    continue
+                pending[pool.submit(_play, teams, seed)] = (index, swapped, key)
+            if not pending: break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, swapped, key = pending.pop(future)
+                result = future.result()
+                simulated += 1
+                if cache:
+                    cache.put(key, result)
+                record(index, swapped, result, "sim")
+
+    elapsed = time.perf_counter() - start
+    log(f"\n{played} matches ({simulated} simulated, {played - simulated} cached) in {elapsed:.1f}s "
+        f"({played / max(1e-9, elapsed):.2f} matches/s)")
+    return matchups
+
+
+def format_matrix(matchups):
+    """Win-rate matrix (row side's win rate vs column side) with 95% intervals."""
+    names_a = list(dict.fromkeys(m.name_a for m in matchups))
+    names_b = list(dict.fromkeys(m.name_b for m in matchups))
+    if set(names_a) & set(names_b):
+        # Round robin: show the full square matrix
+        rows = cols = list(dict.fromkeys(names_a + names_b))
+    else:
+        rows, cols = names_a, names_b
+
+    cells = {}
+    for m in matchups:
+        lo, hi = m.interval_a()
+        cells[(m.name_a, m.name_b)] = f"{m.score_a:.2f} [{lo:.2f},{hi:.2f}] n={m.games}"
+        cells[(m.name_b, m.name_a)] = f"{1 - m.score_a:.2f} [{1 - hi:.2f},{1 - lo:.2f}] n={m.games}"
+
+    width = max(len(v) for v in cells.values()) + 2
+    label_w = max(len(r) for r in rows) + 2
+    lines = [" " * label_w + "".join(c[:width - 2].ljust(width) for c in cols)]
+    for r in rows:
+        lines.append(r.ljust(label_w) + "".join(cells.get((r, c), "-").ljust(width) for c in cols))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless AI Battle League tournaments")
+    parser.add_argument("mode", choices=["franchises", "gauntlet"])
+    parser.add_argument("--games", type=int, default=40, help="max games per matchup")
+    parser.add_argument("--min-games", type=int, default=10, help="games before early stopping may kick in")
+    parser.add_argument("--no-early-stop", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--teams", nargs="+", help="franchise names to include (franchises mode)")
+    parser.add_argument("--challengers", nargs="+", help="bot names to run the gauntlet (gauntlet mode)")
+    parser.add_argument("--seed", type=int, default=0, help="base seed; game seeds are derived from it")
+    parser.add_argument("--cache", default=None, help="result cache path (default: cache/results.sqlite)")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--event-log", default=None, metavar="DIR",
+                        help="write structured event logs of simulated games to DIR (see event_log.py)")
+    args = parser.parse_args()
+
+    if args.mode == "franchises":
+        matchups = franchise_matchups(args.teams)
+    else:
+        matchups = gauntlet_matchups(args.challengers)
+
+    cache = None if args.no_cache else ResultCache(args.cache or result_cache.DEFAULT_PATH)
+    run_tournament(matchups, games=args.games, min_games=args.min_games,
+                   workers=args.workers, early_stop=not args.no_early_stop,
+                   base_seed=args.seed, cache=cache, event_log_dir=args.event_log)
+    if cache:
+        cache.close()
+    print()
+    print(format_matrix(matchups))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,96 +1,201 @@
+import functools
 import pygame
 import settings
-import roster
 import numpy as np
 
-def draw_team_stats(surface, team, y_start, font_text, font_small, color_primary):
-    y_off = y_start
+ROW_HEIGHT = 60
+BAR_WIDTH = 160
+# Cooldown bars only redraw when they cross one of this many steps
+COOLDOWN_BUCKETS = 20
+KILL_FEED_LINES = 8
+KILL_FEED_HEIGHT = 250
+# Team headers in multi-team panels, and the row height below which rows go compact
+SECTION_HEADER_HEIGHT = 32
+COMPACT_ROW_HEIGHT = 40
+
+# --- CACHED TEXT ---
+@functools.lru_cache(maxsize=1024)
+def render_text(font, text, color):
+    """font.render(text, True, color), rendered once per distinct (font, text, color)."""
+    return font.render(text, True, color)
+
+@functools.lru_cache(maxsize=64)
+def render_banner(font, text, color, shadow_offset):
+    """Big centered text with a black drop shadow, composited into one surface."""
+    text_surf = font.render(text, True, color)
+    shadow = font.render(text, True, (0, 0, 0))
+    banner = pygame.Surface((text_surf.get_width() + shadow_offset, text_surf.get_height() + shadow_offset), pygame.SRCALPHA)
+    banner.blit(shadow, (shadow_offset, shadow_offset))
+    banner.blit(text_surf, (0, 0))
+    return banner
+
+
+def _row_state(p):
+    """Everything a stats row shows; the row is only redrawn when this changes."""
+    max_cooldown = getattr(p, 'max_cooldown', 60)
+    cooldown = getattr(p, 'cooldown', 0)
+    if max_cooldown > 0:
+        cd_pct = 1.0 - min(1.0, max(0, cooldown / max_cooldown))
+    else:
+        cd_pct = 1.0
+    return (p.alive, int(p.hp), getattr(p, 'kills', 0), getattr(p, 'deaths', 0),
+            int(getattr(p, 'damage_dealt', 0)), int(cd_pct * COOLDOWN_BUCKETS))
+
+
+def draw_team_row(surface, p, state, font_text, font_small, color_primary):
+    """Draw one bot's stats row (name, K/D, HP bar, DMG, cooldown) onto a row-sized surface.
+    Rows shorter than COMPACT_ROW_HEIGHT (crowded free-for-all panels) show only name, K/D and HP."""
+    alive, hp, kills, deaths, dmg, cd_bucket = state
     panel_width = surface.get_width()
-    bar_width = 160
-    
-    for p in team:
-        # --- PREPARE DATA ---
-        kills = getattr(p, 'kills', 0)
-        deaths = getattr(p, 'deaths', 0)
-        dmg = getattr(p, 'damage_dealt', 0)
-        cooldown = getattr(p, 'cooldown', 0)
-        max_cooldown = getattr(p, 'max_cooldown', 60)
-        
-        text_color = (255, 255, 255) if p.alive else (100, 100, 100)
-        
-        # Row 1: Name and K/D
-        name_txt = font_text.render(p.name, True, text_color)
-        surface.blit(name_txt, (20, y_off))
-        
-        kd_txt = font_text.render(f"K:{kills} D:{deaths}", True, (255, 215, 0))
-        surface.blit(kd_txt, (panel_width - 20 - kd_txt.get_width(), y_off))
-        
-        # Row 2: HP Bar + DMG
-        y_bar = y_off + 22
-        pygame.draw.rect(surface, (50, 0, 0), (20, y_bar, bar_width, 10)) # BG
-        
-        if p.alive:
-            hp_pct = max(0, p.hp / p.max_hp)
-            pygame.draw.rect(surface, color_primary, (20, y_bar, bar_width * hp_pct, 10)) # FG
-            
-            # Tiny HP Text
-            hp_txt = font_small.render(f"{int(p.hp)}/{p.max_hp}", True, (255, 255, 255))
-            surface.blit(hp_txt, (20 + bar_width/2 - hp_txt.get_width()/2, y_bar - 1))
-
-        dmg_txt = font_small.render(f"DMG: {int(dmg)}", True, (200, 200, 200))
-        surface.blit(dmg_txt, (20 + bar_width + 10, y_bar))
-
-        # Row 3: Cooldown Bar
-        if p.alive:
-            y_cd = y_bar + 14
-            if max_cooldown > 0:
-                cd_pct = 1.0 - min(1.0, max(0, cooldown / max_cooldown))
-            else:
-                cd_pct = 1.0
-            pygame.draw.rect(surface, (0, 0, 50), (20, y_cd, bar_width, 4))
-            cd_color = (0, 255, 255) if cd_pct == 1.0 else (0, 100, 200)
-            pygame.draw.rect(surface, cd_color, (20, y_cd, bar_width * cd_pct, 4))
-
-        y_off += 60 # Spacing
-
-# Added font_small to arguments
-def draw_left_panel(surface, green_team, font_title, font_text, font_small): 
     surface.fill(settings.UI_BG_COLOR)
-    
-    # Title
-    title = font_title.render(roster.TEAM_GREEN_TITLE, True, settings.GREEN_TEAM_COLOR)
-    rect = title.get_rect(center=(surface.get_width()//2, 40))
-    surface.blit(title, rect)
-    
-    # Draw Green Stats (Using new function)
-    draw_team_stats(surface, green_team, 80, font_text, font_small, settings.GREEN_TEAM_COLOR)
-
-# Added font_small to arguments
-def draw_right_panel(surface, red_team, kill_feed, font_title, font_text, font_small):
-    surface.fill(settings.UI_BG_COLOR)
-    
-    # Title
-    title = font_title.render(roster.TEAM_RED_TITLE, True, settings.RED_TEAM_COLOR)
-    rect = title.get_rect(center=(surface.get_width()//2, 40))
-    surface.blit(title, rect)
-    
-    # Draw Red Stats (Using new function)
-    draw_team_stats(surface, red_team, 80, font_text, font_small, settings.RED_TEAM_COLOR)
-
-    # Draw Kill Feed
-    kf_y = surface.get_height() - 250
-    pygame.draw.line(surface, (100, 100, 100), (20, kf_y), (surface.get_width()-20, kf_y), 2)
-    
-    kf_title = font_title.render("KILL FEED", True, (255, 255, 0))
-    surface.blit(kf_title, (20, kf_y + 10))
-    
-    msg_y = kf_y + 40
-    for msg in kill_feed[-8:]: 
-        # Using font_small for feed
-        txt = font_small.render(msg, True, (220, 220, 220))
-        surface.blit(txt, (20, msg_y))
-        msg_y += 20
-
-def draw_debug_panel(surface, players, font_text):
-    # (Kept simple for now)
-    pass
\ No newline at end of file
+
+    text_color = (255, 255, 255) if alive else (100, 100, 100)
+
+    if surface.get_height() < COMPACT_ROW_HEIGHT:
+        surface.blit(render_text(font_small, p.name, text_color), (20, 0))
+        kd_txt = render_text(font_small, f"K:{kills} D:{deaths}", (255, 215, 0))
+        surface.blit(kd_txt, (panel_width - 20 - kd_txt.get_width(), 0))
+        pygame.draw.rect(surface, (50, 0, 0), (20, 17, BAR_WIDTH, 4))
+        if alive:
+            pygame.draw.rect(surface, color_primary, (20, 17, BAR_WIDTH * max(0, p.hp / p.max_hp), 4))
+        return
+
+    # Row 1: Name and K/D
+    surface.blit(render_text(font_text, p.name, text_color), (20, 0))
+    kd_txt = render_text(font_text, f"K:{kills} D:{deaths}", (255, 215, 0))
+    surface.blit(kd_txt, (panel_width - 20 - kd_txt.get_width(), 0))
+
+    # Row 2: HP Bar + DMG
+    y_bar = 22
+    pygame.draw.rect(surface, (50, 0, 0), (20, y_bar, BAR_WIDTH, 10)) # BG
+
+    if alive:
+        hp_pct = max(0, p.hp / p.max_hp)
+        pygame.draw.rect(surface, color_primary, (20, y_bar, BAR_WIDTH * hp_pct, 10)) # FG
+
+        # Tiny HP Text
+        hp_txt = render_text(font_small, f"{hp}/{p.max_hp}", (255, 255, 255))
+        surface.blit(hp_txt, (20 + BAR_WIDTH/2 - hp_txt.get_width()/2, y_bar - 1))
+
+    surface.blit(render_text(font_small, f"DMG: {dmg}", (200, 200, 200)), (20 + BAR_WIDTH + 10, y_bar))
+
+    # Row 3: Cooldown Bar
+    if alive:
+        y_cd = y_bar + 14
+        cd_pct = cd_bucket / COOLDOWN_BUCKETS
+        pygame.draw.rect(surface, (0, 0, 50), (20, y_cd, BAR_WIDTH, 4))
+        cd_color = (0, 255, 255) if cd_bucket == COOLDOWN_BUCKETS else (0, 100, 200)
+        pygame.draw.rect(surface, cd_color, (20, y_cd, BAR_WIDTH * cd_pct, 4))
+
+
+class TeamPanel:
+    """Retained-mode side panel: one or more teams of stats rows and an optional kill feed.
+
+    `sections` is a list of (title, color, players). A single team gets the big
+    centered title; several teams get a small colored header each, and rows
+    shrink to fit the panel. The panel keeps its own surface between frames.
+    `update()` redraws only the rows whose shown values changed (and the kill
+    feed when a kill comes in), so a quiet frame costs one tuple compare per bot.
+    """
+    def __init__(self, width, height, sections, font_title, font_text, font_small, kill_feed=None):
+        self.surface = pygame.Surface((width, height))
+        self.font_title = font_title
+        self.font_text = font_text
+        self.font_small = font_small
+        self.kill_feed = kill_feed
+        self.feed_lines = None
+        self.dirty_rects = []  # areas of `surface` changed by the last update()
+        self.surface.fill(settings.UI_BG_COLOR)
+
+        if len(sections) == 1:
+            title, color, _ = sections[0]
+            title_surf = render_text(font_title, title, color)
+            self.surface.blit(title_surf, title_surf.get_rect(center=(width//2, 40)))
+            top, header_h = 80, 0
+        else:
+            top, header_h = 20, SECTION_HEADER_HEIGHT
+        feed_h = KILL_FEED_HEIGHT if kill_feed is not None else 0
+        n_rows = sum(len(players) for _, _, players in sections)
+        available = height - top - feed_h - header_h * len(sections)
+        row_h = min(ROW_HEIGHT, available // max(1, n_rows))
+
+        # (player, team color, y) for every row
+        self.rows = []
+        y = top
+        for title, color, players in sections:
+            if header_h:
+                self.surface.blit(render_text(font_text, title, color), (20, y + 4))
+                y += header_h
+            for p in players:
+                self.rows.append((p, color, y))
+                y += row_h
+        self.row_states = [None] * len(self.rows)
+        self.row_surface = pygame.Surface((width, row_h))
+
+    def update(self):
+        """Bring the panel surface up to date; returns True if anything was redrawn."""
+        self.dirty_rects = []
+        for i, (p, color, y) in enumerate(self.rows):
+            state = _row_state(p)
+            if state != self.row_states[i]:
+                self.row_states[i] = state
+                draw_team_row(self.row_surface, p, state, self.font_text, self.font_small, color)
+                self.dirty_rects.append(self.surface.blit(self.row_surface, (0, y)))
+
+        if self.kill_feed is not None:
+            # The feed is trimmed to the shown lines, so compare contents rather than length
+            feed_lines = tuple(self.kill_feed[-KILL_FEED_LINES:])
+            if feed_lines != self.feed_lines:
+                self.feed_lines = feed_lines
+                self._draw_kill_feed()
+        return bool(self.dirty_rects)
+
+    def _draw_kill_feed(self):
+        surface = self.surface
+        kf_y = surface.get_height() - KILL_FEED_HEIGHT
+        area = pygame.Rect(0, kf_y, surface.get_width(), KILL_FEED_HEIGHT)
+        surface.fill(settings.UI_BG_COLOR, area)
+        pygame.draw.line(surface, (100, 100, 100), (20, kf_y), (surface.get_width()-20, kf_y), 2)
+
+        surface.blit(render_text(self.font_title, "KILL FEED", (255, 255, 0)), (20, kf_y + 10))
+
+        msg_y = kf_y + 40
+        for msg in self.feed_lines:
+            # Using font_small for feed
+            surface.blit(render_text(self.font_small, msg, (220, 220, 220)), (20, msg_y))
+            msg_y += 20
+        self.dirty_rects.append(area)
+
+
+def make_panels(width, height, sections, kill_feed, font_title, font_text, font_small):
+    """(left, right) panels for a match: the first half of the teams on the left,
+    the rest plus the kill feed on the right. `sections` as for TeamPanel."""
+    half = (len(sections) + 1) // 2
+    left = TeamPanel(width, height, sections[:half], font_title, font_text, font_small)
+    right = TeamPanel(width, height, sections[half:], font_title, font_text, font_small, kill_feed=kill_feed)
+    return left, right
+
+# --- PROFILER OVERLAY ---
+PROFILER_COLUMNS = (("phase", 10), ("p50", 170), ("p95", 230), ("p99", 290))
+
+def render_profiler_overlay(rows, frames, font, footer=None):
+    """Translucent table of per-phase frame cost in ms (rows from Profiler.percentiles())."""
+    line_h = font.get_linesize()
+    lines = 2 + len(rows) + (footer is not None)
+    surface = pygame.Surface((350, lines * line_h + 10), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 190))
+
+    title = f"PROFILER  ms/frame over {frames} frames  [P] hide  [E] export trace"
+    surface.blit(render_text(font, title, (255, 255, 0)), (10, 5))
+    y = 5 + line_h
+    for label, x in PROFILER_COLUMNS:
+        surface.blit(render_text(font, label, (180, 180, 180)), (x, y))
+    for phase, *values in rows:
+        y += line_h
+        surface.blit(render_text(font, phase, (255, 255, 255)), (PROFILER_COLUMNS[0][1], y))
+        for value, (_, x) in zip(values, PROFILER_COLUMNS[1:]):
+            # Plain font.render: the numbers change every refresh and would only churn the text cache
+            surface.blit(font.render(f"{value:6.2f}", True, (255, 255, 255)), (x, y))
+    if footer is not None:
+        surface.blit(render_text(font, footer, (0, 255, 255)), (10, y + line_h))
+    return surface
@@ -0,0 +1,314 @@
+"""Structure-of-arrays world state for big crowds.
+
+`Gladiator` keeps its state as attributes and tiny 2-element arrays, which is
+fine for 16 bots but spends most of its time in per-call NumPy overhead. A
+`World` stores the same state for every player in contiguous arrays (one row
+per player) and runs the bulk of a tick as whole-array operations:
+
+  - target acquisition: one distance matrix plus one batched line-of-sight call
+  - steering (approach / strafe at aggression distance / patrol)
+  - melee range checks and damage
+  - friction, integration, body separation and arena clamping
+  - cooldown and timer decrements
+
+It is an alternative engine for crowd fights (hundreds of bots) rather than a
+drop-in copy of `Gladiator.logic`: there is no throwing, and bots engage the
+nearest visible enemy within `SIGHT_RANGE`. It also always steps at the
+reference rate (settings.BASE_SIM_HZ); settings.SIM_HZ only applies to `Match`.
+"""
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import math
+import numpy as np
+import settings
+import roster
+import map_config
+import physics
+import entities
+import vision
+import profiler
+import sdf
+
+SIGHT_RANGE = 800
+# Nearest enemies each scanning bot tests for line of sight
+SCAN_CANDIDATES = 4
+MELEE_RANGE = 70
+FRICTION = 0.9
+
+
+class World:
+    def __init__(self, stats_list, team_ids, positions, polygons=None, seed=None):
+        n = len(stats_list)
+        self.n = n
+        self.polygons = map_config.POLYGONS if polygons is None else polygons
+        self.geometry = physics.get_edge_grid(self.polygons)
+        self.geometry.sdf = sdf.load_or_build(self.polygons)
+        self.rng = np.random.default_rng(seed)
+        self.tick = 0
+        self.names = [s.name for s in stats_list]
+
+        # --- STATE (one row per player) ---
+        self.pos = np.asarray(positions, dtype=np.float64).reshape(n, 2).copy()
+        self.vel = np.zeros((n, 2))
+        self.team = np.asarray(team_ids, dtype=np.int32)
+        self.alive = np.ones(n, dtype=bool)
+        self.radius = np.full(n, 25.0)
+        self.hp = np.array([s.hp for s in stats_list], dtype=np.float64)
+        self.max_hp = self.hp.copy()
+        self.angle = np.where(self.pos[:, 1] < settings.GAME_HEIGHT / 2, math.pi / 2, -math.pi / 2)
+        self.kills = np.zeros(n, dtype=np.int32)
+        self.damage_dealt = np.zeros(n, dtype=np.float64)
+        self.strafe_dir = np.ones(n)
+        self.patrol_target = np.full((n, 2), np.nan)
+        self.target = np.full(n, -1, dtype=np.int64)  # index of locked-on enemy, -1 for none
+
+        # --- TIMERS (frames) ---
+        self.cooldown = np.zeros(n, dtype=np.int32)
+        self.swing_timer = np.zeros(n, dtype=np.int32)
+        self.strafe_cooldown = np.zeros(n, dtype=np.int32)
+        self.warmup_timer = np.full(n, 100, dtype=np.int32)
+        # Random start so bots don't all scan on the same tick (as in Gladiator)
+        self.scan_timer = self.rng.integers(0, 11, n).astype(np.int32)
+
+        # --- BOTSTATS PARAMETERS ---
+        self.speed = np.array([s.speed * 0.6 for s in stats_list])  # same scaling as Gladiator
+        self.melee_dmg = np.array([s.melee_dmg for s in stats_list], dtype=np.float64)
+        self.throw_dmg = np.array([s.throw_dmg for s in stats_list], dtype=np.float64)
+        self.max_cooldown = np.array([s.cooldown for s in stats_list], dtype=np.int32)
+        self.aggression = np.array([s.aggression for s in stats_list], dtype=np.float64)
+        self.strafe_rate = np.array([s.strafe_rate for s in stats_list])
+        self.accuracy = np.array([s.accuracy for s in stats_list])
+        self.melee_bias = np.array([s.melee_bias for s in stats_list])
+
+    @classmethod
+    def from_players(cls, players, polygons=None, seed=None):
+        """Build a World from existing Gladiators (e.g. `match.all_players`)."""
+        world = cls([p.stats for p in players], [p.team_id for p in players],
+                    [p.pos for p in players], polygons=polygons, seed=seed)
+        world.vel[:] = [p.vel for p in players]
+        world.alive[:] = [p.alive for p in players]
+        world.hp[:] = [p.hp for p in players]
+        world.angle[:] = [p.angle for p in players]
+        world.cooldown[:] = [p.cooldown for p in players]
+        world.warmup_timer[:] = [p.warmup_timer for p in players]
+        return world
+
+    def write_back(self, players):
+        """Copy array state onto Gladiators so the normal renderer/UI can draw them."""
+        for i, p in enumerate(players):
+            p.pos[:] = self.pos[i]
+            p.vel[:] = self.vel[i]
+            p.alive = bool(self.alive[i])
+            p.hp = float(self.hp[i])
+            p.angle = float(self.angle[i])
+            p.cooldown = int(self.cooldown[i])
+            p.swing_timer = int(self.swing_timer[i])
+            p.kills = int(self.kills[i])
+            p.damage_dealt = float(self.damage_dealt[i])
+
+    # --- WHOLE-ARRAY QUERIES ---
+    def distance_matrix(self):
+        diff = self.pos[:, None, :] - self.pos[None, :, :]
+        return np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+
+    def enemy_distances(self, dist=None):
+        """Distance matrix with teammates, dead players and self masked to +inf."""
+        if dist is None:
+            dist = self.distance_matrix()
+        enemy = (self.team[:, None] != self.team[None, :]) & self.alive[None, :] & self.alive[:, None]
+        return np.where(enemy, dist, np.inf)
+
+    def nearest_enemy(self, dist=None):
+        """Return (index, distance) of each player's closest live enemy (distance inf if none)."""
+        d = self.enemy_distances(dist)
+        target = np.argmin(d, axis=1)
+        return target, d[np.arange(self.n), target]
+
+    def acquire_targets(self, dist=None):
+        """Throttled, line-of-sight gated targeting for the whole crowd.
+
+        Bots whose scan timer runs out this tick test their SCAN_CANDIDATES nearest
+        enemies in a single `vision.line_of_sight_batch` call and lock onto the
+        closest visible one. Everyone else keeps their target while it stays
+        alive and in range. Returns (target index, distance), distance inf if none.
+        """
+        d = self.enemy_distances(dist)
+        rows = np.arange(self.n)
+        locked = self.target >= 0
+        current = d[rows, np.where(locked, self.target, 0)]
+        self.target[~locked | ~(current < SIGHT_RANGE)] = -1
+
+        np.subtract(self.scan_timer, 1, out=self.scan_timer, where=self.scan_timer > 0)
+        scanning = np.flatnonzero(self.alive & (self.scan_timer == 0))
+        if len(scanning):
+            k = min(SCAN_CANDIDATES, self.n)
+            sub = d[scanning]
+            cand = np.argpartition(sub, k - 1, axis=1)[:, :k]
+            cand_dist = np.take_along_axis(sub, cand, axis=1)
+            order = np.argsort(cand_dist, axis=1)
+            cand = np.take_along_axis(cand, order, axis=1)
+            in_range = np.take_along_axis(cand_dist, order, axis=1) < SIGHT_RANGE
+
+            visible = np.zeros_like(in_range)
+            viewers = np.repeat(scanning, k)[in_range.ravel()]
+            visible[in_range] = vision.line_of_sight_batch(self.pos[viewers], self.pos[cand[in_range]], self.geometry)
+            first = np.argmax(visible, axis=1)  # candidates are sorted, so this is the closest visible
+            self.target[scanning] = np.where(visible.any(axis=1), cand[np.arange(len(scanning)), first], -1)
+            self.scan_timer[scanning] = 6 + self.rng.integers(0, 4, len(scanning))
+
+        locked = self.target >= 0
+        target = np.where(locked, self.target, 0)
+        return target, np.where(locked, d[rows, target], np.inf)
+
+    def melee_candidates(self, target, target_dist):
+        """Mask of players that can stab their target (a live enemy in range) this tick."""
+        valid = self.alive[target] & (self.team[target] != self.team)
+        return self.alive & valid & (target_dist < MELEE_RANGE) & (self.cooldown <= 0)
+
+    # --- WHOLE-ARRAY UPDATES ---
+    def apply_friction_and_integrate(self):
+        self.vel *= FRICTION
+        self.vel[~self.alive] = 0.0
+        self.pos += self.vel
+
+    def decrement_timers(self):
+        for timer in (self.cooldown, self.swing_timer, self.strafe_cooldown, self.warmup_timer):
+            np.subtract(timer, 1, out=timer, where=timer > 0)
+
+    def separate_bodies(self):
+        """One relaxation pass pushing overlapping live bodies half the overlap apart."""
+        diff = self.pos[:, None, :] - self.pos[None, :, :]
+        dist = np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+        min_dist = self.radius[:, None] + self.radius[None, :]
+        overlap = (dist < min_dist) & self.alive[:, None] & self.alive[None, :]
+        np.fill_diagonal(overlap, False)
+        if not overlap.any():
+            return
+        safe = np.where(dist > 0, dist, 1.0)
+        normal = diff / safe[:, :, None]
+        normal[dist == 0] = (1.0, 0.0)
+        push = np.where(overlap, (min_dist - dist) * 0.5, 0.0)
+        self.pos += np.einsum("ij,ijk->ik", push, normal)
+
+    def resolve_walls(self):
+        """Push every live body out of the walls with one batched resolver call."""
+        live = np.flatnonzero(self.alive)
+        if len(live) == 0:
+            return
+        pos, vel = self.pos[live], self.vel[live]
+        self.geometry.resolve_all(pos, vel, self.radius[live])
+        self.pos[live] = pos
+        self.vel[live] = vel
+
+    def clamp_to_arena(self):
+        np.clip(self.pos[:, 0], 0, settings.GAME_WIDTH, out=self.pos[:, 0])
+        np.clip(self.pos[:, 1], 0, settings.GAME_HEIGHT, out=self.pos[:, 1])
+
+    def step(self):
+        """Advance every player by one tick and return the events produced (see match.py)."""
+        events = []
+        n = self.n
+        idx = np.arange(n)
+        alive = self.alive
+        prof = profiler.current
+        if prof: t = prof.now()
+
+        # 1. TARGETS
+        target, target_dist = self.acquire_targets()
+        if prof: t = prof.lap("world.targets", t)
+        engaged = alive & (target_dist < SIGHT_RANGE)
+        to_target = self.pos[target] - self.pos
+
+        # 2. STEERING
+        flip = alive & (self.strafe_cooldown <= 0) & (self.rng.random(n) < self.strafe_rate)
+        self.strafe_dir[flip] *= -1
+        self.strafe_cooldown[flip] = 14
+
+        desired = np.where(self.melee_bias > 0.6, 0.0, self.aggression)
+        approach = engaged & (target_dist > desired)
+        strafe = engaged & ~approach
+        perp = np.stack([-to_target[:, 1], to_target[:, 0]], axis=1)
+        dist_factor = np.where(engaged, target_dist - desired, 0.0) * 0.01
+        strafe_vec = perp * self.strafe_dir[:, None] + to_target * dist_factor[:, None]
+
+        # Patrol: pick a new random point once the old one is reached
+        idle = alive & ~engaged
+        patrol_dist = np.linalg.norm(self.pos - self.patrol_target, axis=1)
+        repick = idle & ~(patrol_dist >= 50)  # NaN (no target yet) also repicks
+        if repick.any():
+            k = int(repick.sum())
+            self.patrol_target[repick] = np.column_stack([
+                self.rng.uniform(50, settings.GAME_WIDTH - 50, k),
+                self.rng.uniform(50, settings.GAME_HEIGHT - 50, k),
+            ])
+
+        move = np.zeros((n, 2))
+        move[approach] = to_target[approach]
+        move[strafe] = strafe_vec[strafe]
+        move[idle] = self.patrol_target[idle] - self.pos[idle]
+        move_len = np.linalg.norm(move, axis=1)
+        moving = move_len > 1e-6
+        self.vel[moving] += move[moving] / move_len[moving, None] * self.speed[moving, None]
+
+        # 3. FACING
+        self.angle[engaged] = np.arctan2(to_target[engaged, 1], to_target[engaged, 0])
+        drifting = alive & ~engaged & (np.linalg.norm(self.vel, axis=1) > 0.5)
+        self.angle[drifting] = np.arctan2(self.vel[drifting, 1], self.vel[drifting, 0])
+
+        if prof: t = prof.lap("world.steering", t)
+
+        # 4. MELEE
+        attackers = idx[engaged & self.melee_candidates(target, target_dist)]
+        if len(attackers):
+            victims = target[attackers]
+            np.subtract.at(self.hp, victims, self.melee_dmg[attackers])
+            self.damage_dealt[attackers] += self.melee_dmg[attackers]
+            self.cooldown[attackers] = 30
+            self.swing_timer[attackers] = 15
+            events.extend(("sound", "swing") for _ in attackers)
+
+            died = alive & (self.hp <= 0)
+            if died.any():
+                # Credit each kill to the first attacker (in player order) on that victim
+                killed, first = np.unique(victims, return_index=True)
+                for victim, killer in zip(killed, attackers[first]):
+                    if died[victim]:
+                        self.kills[killer] += 1
+                        events.append(("sound", "death"))
+                        events.append(("kill", self.names[killer], "STABBED", self.names[victim]))
+                self.alive &= ~died
+
+        if prof: t = prof.lap("world.melee", t)
+
+        # 5. FRICTION, MOVEMENT & COLLISIONS
+        self.apply_friction_and_integrate()
+        self.separate_bodies()
+        self.resolve_walls()
+        self.clamp_to_arena()
+
+        self.decrement_timers()
+        if prof: prof.lap("world.movement", t)
+        self.tick += 1
+        return events
+
+    def teams_alive(self):
+        return sorted(set(self.team[self.alive].tolist()))
+
+
+def make_crowd(n, n_teams=2, polygons=None, seed=0):
+    """Spawn `n` bots (stats cycled from the roster) on free random spots of the map."""
+    polygons = map_config.POLYGONS if polygons is None else polygons
+    rng = np.random.default_rng(seed)
+    geometry = physics.get_edge_grid(polygons)
+    geometry.sdf = sdf.load_or_build(polygons)
+    stats, teams, positions = [], [], []
+    for i in range(n):
+        stats.append(roster.ALL_BOTS[i % len(roster.ALL_BOTS)])
+        teams.append(i % n_teams)
+        for _ in range(50):
+            pt = rng.uniform((50, 50), (settings.GAME_WIDTH - 50, settings.GAME_HEIGHT - 50))
+            if entities.is_point_free(pt, geometry, 25):
+                break
+        positions.append(pt)
+    return World(stats, teams, positions, polygons=polygons, seed=seed)